@@ -24,6 +24,18 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Use orjson for JSONB (de)serialization when available - much faster than
+# the stdlib json module for the raw_api_data / formats payloads
+try:
+    import orjson
+
+    JSON_ENGINE_KWARGS = {
+        "json_serializer": lambda obj: orjson.dumps(obj).decode("utf-8"),
+        "json_deserializer": orjson.loads,
+    }
+except ImportError:
+    JSON_ENGINE_KWARGS = {}
+
 # Create declarative base for models
 Base = declarative_base()
 
@@ -34,10 +46,12 @@ DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://localhost/video_llm_eval"
 engine = create_engine(
     DATABASE_URL,
     poolclass=QueuePool,
-    pool_size=5,
-    max_overflow=10,
+    pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
     pool_pre_ping=True,  # Verify connections before using
+    pool_recycle=3600,  # Replace connections older than an hour
     echo=False,  # Set to True for SQL query logging
+    **JSON_ENGINE_KWARGS,
 )
 
 # Create session factory
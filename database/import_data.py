@@ -5,6 +5,9 @@ Data import utilities for populating the database from CSV/JSON files.
 import csv
 import json
 import logging
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, Dict, Any, List
 from datetime import datetime
@@ -14,8 +17,17 @@ from tqdm import tqdm
 
 from database.models import Note, Tweet, MediaMetadata
 
+# Parse info.json files with orjson when available (faster than stdlib json)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Threads reading/parsing info.json files ahead of the database writes
+INFO_READ_WORKERS = 16
+
 
 def import_notes_from_tsv(
     session: Session,
@@ -242,6 +254,45 @@ def import_tweets_from_api_data(
     return stats
 
 
+def _read_info_json(info_file: Path):
+    """
+    Read and parse one info.json file.
+
+    Returns:
+        Tuple of (info dict, None) on success or (None, exception) on failure
+    """
+    try:
+        if orjson is not None:
+            return orjson.loads(info_file.read_bytes()), None
+        with open(info_file, "r", encoding="utf-8") as f:
+            return json.load(f), None
+    except Exception as e:
+        return None, e
+
+
+def _iter_info_files(info_files: List[Path], max_workers: int = INFO_READ_WORKERS):
+    """
+    Yield (info_file, info, error) in order, parsing files ahead on a thread pool.
+
+    At most max_workers * 4 parsed files are held in memory at a time.
+
+    Args:
+        info_files: Paths of *.info.json files
+        max_workers: Number of reader threads
+    """
+    window = max_workers * 4
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        for info_file in info_files:
+            pending.append((info_file, executor.submit(_read_info_json, info_file)))
+            if len(pending) >= window:
+                done_file, future = pending.popleft()
+                yield (done_file, *future.result())
+        while pending:
+            done_file, future = pending.popleft()
+            yield (done_file, *future.result())
+
+
 def import_media_metadata_from_json(
     session: Session, json_files_dir: Path, batch_size: int = 100
 ) -> Dict[str, int]:
@@ -260,24 +311,42 @@ def import_media_metadata_from_json(
 
     stats = {"total": 0, "imported": 0, "updated": 0, "errors": 0}
 
-    # Find all info.json files
-    info_files = list(json_files_dir.glob("*.info.json"))
+    # Find all info.json files (one os.scandir pass, suffix check on names);
+    # a missing directory imports nothing, as glob did
+    info_files = []
+    if json_files_dir.is_dir():
+        with os.scandir(json_files_dir) as entries:
+            info_files = [
+                Path(entry.path)
+                for entry in entries
+                if entry.name.endswith(".info.json") and entry.is_file()
+            ]
     batch = []
 
-    for info_file in tqdm(info_files, desc="Importing media metadata"):
+    for info_file, info, error in tqdm(
+        _iter_info_files(info_files),
+        total=len(info_files),
+        desc="Importing media metadata",
+    ):
         stats["total"] += 1
 
-        try:
-            with open(info_file, "r", encoding="utf-8") as f:
-                info = json.load(f)
+        if error is not None:
+            logger.error(f"Error processing {info_file}: {error}")
+            stats["errors"] += 1
+            continue
+
+        # File name without ".info.json" (e.g. video_001_1234567890), by
+        # slicing the name instead of building PurePath stems
+        video_stem = info_file.name[: -len(".info.json")]
 
+        try:
             # Extract tweet_id from filename or info
             tweet_id = None
             if "id" in info:
                 tweet_id = int(info["id"])
             else:
                 # Try to extract from filename (e.g., video_001_1234567890.info.json)
-                parts = info_file.stem.split("_")
+                parts = video_stem.split("_")
                 for part in parts:
                     if part.isdigit() and len(part) > 10:
                         tweet_id = int(part)
@@ -317,9 +386,7 @@ def import_media_metadata_from_json(
                 "width": width,
                 "height": height,
                 "formats": info.get("formats"),  # Store as JSONB
-                "local_path": str(
-                    info_file.parent / info_file.stem.replace(".info", "")
-                ),
+                "local_path": os.path.join(os.path.dirname(info_file), video_stem),
             }
 
             if existing:
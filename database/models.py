@@ -20,11 +20,17 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     Index,
+    and_,
+    func,
+    or_,
 )
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import column_property, deferred, relationship
 from database.config import Base
 
+# Note classification that marks a note as misleading
+MISLEADING_CLASSIFICATION = "MISINFORMED_OR_POTENTIALLY_MISLEADING"
+
 
 class Note(Base):
     """
@@ -120,14 +126,21 @@ class Tweet(Base):
     media_type = Column(String(50), nullable=True, index=True)
     
     # Raw API data (JSONB for complete data preservation)
-    raw_api_data = Column(JSONB, nullable=True)
+    # Deferred: the blob is only loaded on access; filters use the
+    # tweet_lang / has_referenced_tweets / has_api_data properties below
+    raw_api_data = deferred(Column(JSONB, nullable=True))
     api_fetched_at = Column(DateTime, nullable=True)
     
     # URL for direct access to tweet on Twitter/X
     tweet_url = Column(String(500), nullable=True)
     
     # Relationships
-    notes = relationship("Note", back_populates="tweet", cascade="all, delete-orphan")
+    notes = relationship(
+        "Note",
+        back_populates="tweet",
+        cascade="all, delete-orphan",
+        order_by="Note.created_at_millis",
+    )
     media_metadata = relationship("MediaMetadata", back_populates="tweet", cascade="all, delete-orphan")  # Now one-to-many
     
     def __repr__(self):
@@ -191,6 +204,54 @@ class MediaMetadata(Base):
         return f"<MediaMetadata(media_key={self.media_key}, tweet_id={self.tweet_id}, video_index={self.video_index}, media_type={self.media_type})>"
 
 
+def _jsonb_nonempty(expr):
+    """
+    SQL expression that is true when a JSONB value is a non-empty array,
+    object or string (what Python treats as a truthy sized value).
+
+    Numbers and booleans count as empty: they carry no referenced tweets.
+    Missing keys give false rather than NULL, so NOT of it stays usable.
+    """
+    return func.coalesce(
+        and_(
+            func.jsonb_typeof(expr).in_(("array", "object", "string")),
+            expr.astext.notin_(("[]", "{}", "")),
+        ),
+        False,
+    )
+
+
+# Scalar views of raw_api_data computed server-side, so filtering tweets by
+# language / retweet status does not transfer or parse the full JSON blob.
+# The API payload may store fields at the root or nested under 'data'.
+# Deferred: plain select(Tweet) / session.query(Tweet) skip the JSONB work;
+# select them explicitly (or undefer them) where they are needed.
+_raw_api_data = Tweet.__table__.c.raw_api_data
+
+Tweet.has_api_data = column_property(_raw_api_data.isnot(None), deferred=True)
+# Empty strings count as "no language", at either level, like NULL
+Tweet.tweet_lang = column_property(
+    func.coalesce(
+        func.nullif(_raw_api_data["lang"].astext, ""),
+        func.nullif(_raw_api_data["data"]["lang"].astext, ""),
+    ),
+    deferred=True,
+)
+Tweet.has_referenced_tweets = column_property(
+    or_(
+        _jsonb_nonempty(_raw_api_data["referenced_tweets"]),
+        _jsonb_nonempty(_raw_api_data["data"]["referenced_tweets"]),
+    ),
+    deferred=True,
+)
+
+
+# Misleading flag computed in SQL so callers don't compare classifications
+Note.is_misleading = column_property(
+    func.coalesce(Note.classification == MISLEADING_CLASSIFICATION, False)
+)
+
+
 # Create indexes for common queries
 Index("idx_notes_classification", Note.classification)
 Index("idx_notes_tweet_id", Note.tweet_id)
@@ -6,13 +6,31 @@ Provides both SQLAlchemy ORM and raw SQL query examples.
 
 import logging
 from typing import List, Dict, Optional, Any
-from sqlalchemy import text
+from sqlalchemy import BigInteger, any_, literal, text
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Session
 from database.models import Note, Tweet, MediaMetadata
 
 logger = logging.getLogger(__name__)
 
 
+def id_in(column, ids):
+    """
+    Membership filter on a BigInteger ID column bound as one array parameter.
+
+    Equivalent to column.in_(ids), but renders as ``column = ANY(:ids)`` so
+    large ID lists send a single parameter instead of one placeholder each.
+
+    Args:
+        column: BigInteger column (e.g. Note.tweet_id)
+        ids: Iterable of IDs (ints or numeric strings)
+
+    Returns:
+        SQLAlchemy boolean expression
+    """
+    return column == any_(literal([int(i) for i in ids], type_=ARRAY(BigInteger)))
+
+
 def get_notes_by_tweet_id(session: Session, tweet_id: int) -> List[Note]:
     """
     Get all notes for a specific tweet.
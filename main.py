@@ -131,6 +131,22 @@ class VideoLLMCLI:
         """Test environment setup."""
         return self.run_script("test_setup.py")
 
+    @staticmethod
+    def count_csv_rows(csv_file, chunksize=200_000):
+        """
+        Count the data rows of a CSV file without loading it into memory.
+
+        Only the first column is converted and the file is read in chunks,
+        so memory stays bounded by one chunk. Quoted multi-line fields
+        (e.g. note summaries) are still counted as one row.
+        """
+        import pandas as pd
+
+        return sum(
+            len(chunk)
+            for chunk in pd.read_csv(csv_file, usecols=[0], chunksize=chunksize)
+        )
+
     def show_results(self):
         """Show summary of collected data."""
         print("\n" + "=" * 70)
@@ -148,17 +164,13 @@ class VideoLLMCLI:
         # Filtered data
         media_file = data_dir / "filtered" / "media_notes.csv"
         if media_file.exists():
-            import pandas as pd
-
-            df = pd.read_csv(media_file)
-            print(f"✓ Media Notes: {len(df):,} notes")
+            print(f"✓ Media Notes: {self.count_csv_rows(media_file):,} notes")
 
         video_file = data_dir / "filtered" / "verified_video_notes.csv"
         if video_file.exists():
-            import pandas as pd
-
-            df = pd.read_csv(video_file)
-            print(f"✓ Verified Video Notes: {len(df):,} notes")
+            print(
+                f"✓ Verified Video Notes: {self.count_csv_rows(video_file):,} notes"
+            )
 
         # Videos
         videos_dir = data_dir / "videos"
@@ -7,10 +7,19 @@ Queries notes, tweets, and media_metadata tables to build the final dataset.
 Updated to use database instead of CSV files.
 """
 
+import csv
 import json
 import logging
+import math
+import os
+import random
+import shutil
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby, islice
+from operator import attrgetter
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Set
 from datetime import datetime
 import sys
 
@@ -19,12 +28,299 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from services.twitter_service import TwitterService
 from database import get_session, Note, Tweet, MediaMetadata
+from database.models import MISLEADING_CLASSIFICATION
+from database.queries import id_in
+from sqlalchemy import String, cast, func, literal, select
+from sqlalchemy.orm import load_only
+
+# orjson is much faster than the stdlib json module for the large dataset dump
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 logger = logging.getLogger(__name__)
 
+# Fallback URL prefixes for rows whose stored tweet_url / note_url is NULL
+# or empty (applied in SQL with COALESCE(NULLIF(url, ''), ...) so Python
+# never builds them per row)
+TWEET_URL_PREFIX = "https://twitter.com/i/status/"
+NOTE_URL_PREFIX = "https://twitter.com/i/birdwatch/n/"
+
+# Parallel Twitter API batch requests when fetching missing tweet data.
+# All workers share TwitterService's request throttle (one request per
+# second, one 429 back-off), so extra workers only overlap response latency
+API_MAX_WORKERS = 2
+
+# Parallel directory scans when checking that video files exist
+SCAN_MAX_WORKERS = 16
+
+# Columns create_dataset actually reads; everything else is left unloaded
+TWEET_COLUMNS = (
+    Tweet.tweet_id,
+    func.coalesce(
+        func.nullif(Tweet.tweet_url, ""),
+        literal(TWEET_URL_PREFIX) + cast(Tweet.tweet_id, String),
+    ).label("tweet_url"),
+    Tweet.text,
+    Tweet.author_name,
+    Tweet.author_username,
+    Tweet.author_verified,
+    Tweet.created_at,
+    Tweet.likes,
+    Tweet.retweets,
+    Tweet.replies,
+    Tweet.quotes,
+    Tweet.has_api_data,
+    Tweet.tweet_lang,
+    Tweet.has_referenced_tweets,
+)
+MEDIA_COLUMNS = (
+    MediaMetadata.media_key,
+    MediaMetadata.tweet_id,
+    MediaMetadata.media_type,
+    MediaMetadata.title,
+    MediaMetadata.uploader,
+    MediaMetadata.duration_ms,
+    MediaMetadata.width,
+    MediaMetadata.height,
+    MediaMetadata.local_path,
+)
+NOTE_COLUMNS = (
+    Note.note_id,
+    Note.tweet_id,
+    Note.note_url,
+    Note.classification,
+    Note.summary,
+    Note.created_at_millis,
+    Note.current_status,
+    Note.is_misleading,
+    Note.believable,
+    Note.harmful,
+    Note.validation_difficulty,
+    Note.misleading_factual_error,
+    Note.misleading_manipulated_media,
+    Note.misleading_missing_important_context,
+    Note.misleading_outdated_information,
+    Note.misleading_unverified_claim_as_fact,
+    Note.misleading_satire,
+    Note.not_misleading_factually_correct,
+    Note.not_misleading_clearly_satire,
+    Note.not_misleading_personal_opinion,
+)
+
+# Row types for the column-only tweet/media query (same attribute names as
+# the ORM models, without identity-map or instrumentation overhead)
+TweetRow = namedtuple("TweetRow", [column.key for column in TWEET_COLUMNS])
+MediaRow = namedtuple("MediaRow", [column.key for column in MEDIA_COLUMNS])
+
+# Notes are loaded with a raw DB-API cursor; set False to use the ORM query
+USE_RAW_DBAPI = True
+
+# Rows fetched per round trip when streaming notes
+NOTES_BATCH_SIZE = 2000
+
+# When sampling, only sample_size * SQL_SAMPLE_OVERSAMPLE tweets are pulled
+# from the database (headroom for tweets whose video file is missing)
+SQL_SAMPLE_OVERSAMPLE = 1.5
+
+# Row type for raw notes queries (same attribute names as Note)
+NoteRow = namedtuple("NoteRow", [column.key for column in NOTE_COLUMNS])
+
+# Computed columns of the raw notes query (everything else is selected as-is)
+NOTES_SQL_EXPRESSIONS = {
+    "is_misleading": "COALESCE(classification = %(misleading)s, false)",
+    "note_url": "COALESCE(NULLIF(note_url, ''), %(note_url_prefix)s || note_id)",
+}
+
+NOTES_SQL = "SELECT {} FROM notes WHERE tweet_id = ANY(%(tweet_ids)s)".format(
+    ", ".join(
+        f"{NOTES_SQL_EXPRESSIONS[name]} AS {name}"
+        if name in NOTES_SQL_EXPRESSIONS
+        else name
+        for name in NoteRow._fields
+    )
+)
+
+# Column order of dataset.csv (one row per tweet)
+CSV_HEADER = (
+    "sample_id",
+    "tweet_id",
+    "tweet_url",
+    "tweet_text",
+    "tweet_author",
+    "tweet_likes",
+    "tweet_created_at",
+    "video_filename",
+    "video_duration",
+    "num_notes",
+    "note_ids",
+    "note_current_status",
+    "note_classifications",
+    "is_misleading",
+)
+
+# Output key -> Note attribute of the "reasons" / "not_misleading_reasons"
+# objects; each group is read with one attrgetter call per note
+MISLEADING_REASONS = (
+    ("factual_error", "misleading_factual_error"),
+    ("manipulated_media", "misleading_manipulated_media"),
+    ("missing_context", "misleading_missing_important_context"),
+    ("outdated_info", "misleading_outdated_information"),
+    ("unverified_claim", "misleading_unverified_claim_as_fact"),
+    ("satire", "misleading_satire"),
+)
+NOT_MISLEADING_REASONS = (
+    ("factually_correct", "not_misleading_factually_correct"),
+    ("clearly_satire", "not_misleading_clearly_satire"),
+    ("personal_opinion", "not_misleading_personal_opinion"),
+)
+_MISLEADING_KEYS = tuple(key for key, _ in MISLEADING_REASONS)
+_NOT_MISLEADING_KEYS = tuple(key for key, _ in NOT_MISLEADING_REASONS)
+_get_misleading = attrgetter(*(attr for _, attr in MISLEADING_REASONS))
+_get_not_misleading = attrgetter(*(attr for _, attr in NOT_MISLEADING_REASONS))
+
+
+def note_entry(note) -> Dict:
+    """Build the community_notes entry for one Note (ORM object or NoteRow)."""
+    return {
+        "note_id": str(note.note_id),
+        "note_url": note.note_url
+        or f"{NOTE_URL_PREFIX}{note.note_id}",  # ORM path only
+        "classification": note.classification or "",
+        "summary": note.summary or "",
+        "is_misleading": note.is_misleading,
+        "created_at_millis": note.created_at_millis,
+        "current_status": note.current_status or "",  # NEW FIELD
+        "reasons": dict(
+            zip(_MISLEADING_KEYS, [value or 0 for value in _get_misleading(note)])
+        ),
+        "not_misleading_reasons": dict(
+            zip(
+                _NOT_MISLEADING_KEYS,
+                [value or 0 for value in _get_not_misleading(note)],
+            )
+        ),
+        "believable": note.believable,
+        "harmful": note.harmful,
+        "validation_difficulty": note.validation_difficulty,
+    }
+
+
+def dumps_indented(obj) -> bytes:
+    """Serialize obj as 2-space indented UTF-8 JSON (orjson when available)."""
+    if orjson is not None:
+        # OPT_NON_STR_KEYS matches json's coercion of e.g. int dict keys
+        return orjson.dumps(
+            obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def write_dataset_json(json_file: Path, header: Dict, samples: Iterable[Dict]):
+    """
+    Write dataset.json incrementally: header keys first, then one sample at a time.
+
+    Produces the same document as dumping {**header, "samples": samples}
+    with indent=2, but never holds the whole serialized dataset in memory.
+
+    Args:
+        json_file: Output path
+        header: Top-level keys written before "samples"
+        samples: Dataset entries (any iterable, e.g. a generator)
+    """
+    with open(json_file, "wb") as f:
+        # Reopen the serialized header object to append the samples key
+        f.write(dumps_indented(header)[:-2])
+        f.write(b',\n  "samples": [')
+        separator = b"\n    "
+        for entry in samples:
+            f.write(separator)
+            separator = b",\n    "
+            # Nest the entry two levels deep (newlines inside strings are escaped)
+            f.write(dumps_indented(entry).replace(b"\n", b"\n    "))
+        f.write(b"]\n}" if separator == b"\n    " else b"\n  ]\n}")
+
+
+def csv_row(entry: Dict) -> tuple:
+    """Build the CSV_HEADER-ordered row for one tweet, with comma-separated note fields."""
+    tweet = entry["tweet"]
+    notes = entry["community_notes"]
+    return (
+        entry["metadata"]["sample_id"],
+        tweet["tweet_id"],
+        tweet["url"],
+        tweet["text"],
+        tweet["author_username"],
+        tweet["engagement"]["likes"],
+        tweet["created_at"],
+        entry["video"]["filename"],
+        entry["video"]["duration_seconds"],
+        len(notes),
+        ",".join(note["note_id"] for note in notes),
+        ",".join(note.get("current_status", "") or "UNKNOWN" for note in notes),
+        ",".join(note["classification"] or "" for note in notes),
+        ",".join(str(note["is_misleading"]) for note in notes),
+    )
+
+
+def write_dataset_files(
+    json_file: Path, csv_file: Path, header: Dict, samples: Iterable[Dict]
+) -> bool:
+    """
+    Write dataset.json and dataset.csv in a single pass over the samples.
+
+    Each entry is serialized to JSON and written as a CSV row as it is
+    produced, so samples can be a generator and are never all in memory.
+    A CSV failure is logged and leaves the JSON output unaffected.
+
+    Args:
+        json_file: JSON output path
+        csv_file: CSV output path
+        header: Top-level JSON keys written before "samples"
+        samples: Dataset entries (any iterable, e.g. a generator)
+
+    Returns:
+        True if the CSV file was written
+    """
+    csv_saved = True
+    try:
+        csv_f = open(csv_file, "w", newline="", encoding="utf-8")
+    except OSError as e:
+        logger.warning(f"Could not save CSV: {e}")
+        csv_f = None
+        csv_saved = False
+
+    def tee_csv(entries):
+        nonlocal csv_saved
+        writer = None
+        for entry in entries:
+            if csv_saved:
+                try:
+                    if writer is None:
+                        writer = csv.writer(csv_f, lineterminator="\n")
+                        writer.writerow(CSV_HEADER)
+                    writer.writerow(csv_row(entry))
+                except Exception as e:
+                    logger.warning(f"Could not save CSV: {e}")
+                    csv_saved = False
+            yield entry
+        if csv_saved and writer is None:
+            csv.writer(csv_f, lineterminator="\n").writerow(CSV_HEADER)
+
+    try:
+        write_dataset_json(json_file, header, tee_csv(samples))
+    finally:
+        if csv_f is not None:
+            csv_f.close()
+            if not csv_saved:
+                csv_file.unlink(missing_ok=True)
+
+    return csv_saved
+
 
 class DatasetCreator:
     """Creates the complete evaluation dataset from database."""
@@ -38,10 +334,10 @@ class DatasetCreator:
         api_data_only: bool = False,
         note_status_filter: str = None,
         tweet_ids: List[str] = None,
+        filter_stats: bool = False,
     ):
         self.data_dir = Path(data_dir)
-        self.output_dir = self.data_dir / "evaluation"
-        self.output_dir.mkdir(exist_ok=True)
+        self.output_dir = self.data_dir / "evaluation"  # Created by save_dataset
         self.force_api_fetch = force_api_fetch
         self.sample_size = sample_size  # Number of samples to randomly select
         self.random_seed = (
@@ -52,6 +348,7 @@ class DatasetCreator:
         self.api_data_only = api_data_only  # Only include tweets with existing API data
         self.note_status_filter = note_status_filter  # Filter notes by status
         self.tweet_ids = tweet_ids  # Optional: specific tweet IDs to include
+        self.filter_stats = filter_stats  # Log per-filter counts (extra query)
 
         self.twitter = TwitterService(force=force_api_fetch)
 
@@ -60,76 +357,188 @@ class DatasetCreator:
         """
         Check if tweet is an original tweet (not a retweet or reply).
 
+        Uses the SQL-computed has_referenced_tweets property so the raw
+        API JSON never has to be loaded or parsed.
+
         Args:
-            tweet: Tweet object with raw_api_data
+            tweet: Tweet object or TweetRow
 
         Returns:
             True if original tweet, False if retweet or reply
         """
-        if not tweet.raw_api_data:
-            # If no API data, can't determine - assume original
-            return True
+        # Without API data we can't determine - assume original
+        return not tweet.has_referenced_tweets
+
+    @staticmethod
+    def is_english_tweet(tweet: Tweet) -> bool:
+        """
+        Check if tweet is in English.
 
-        api_data = tweet.raw_api_data
+        Uses the SQL-computed tweet_lang property so the raw API JSON
+        never has to be loaded or parsed.
 
-        # Check for referenced_tweets (indicates retweet or reply)
-        # The structure can be in different places depending on API response
-        referenced_tweets = None
+        Args:
+            tweet: Tweet object or TweetRow
 
-        # Check in root level
-        if isinstance(api_data, dict):
-            referenced_tweets = api_data.get("referenced_tweets")
+        Returns:
+            True if tweet is in English, False otherwise
+        """
+        # Missing lang means we can't determine - assume English
+        return (tweet.tweet_lang or "en") == "en"
 
-            # Also check in 'data' if present (some API responses nest it)
-            if not referenced_tweets and "data" in api_data:
-                if isinstance(api_data["data"], dict):
-                    referenced_tweets = api_data["data"].get("referenced_tweets")
+    @staticmethod
+    def scan_directory(directory: str) -> Set[str]:
+        """
+        List the existing file names in a directory with one os.scandir call.
 
-        # If referenced_tweets exists and is not empty, it's not original
-        if referenced_tweets and len(referenced_tweets) > 0:
-            return False
+        Args:
+            directory: Directory path ("" means the current directory)
 
-        return True
+        Returns:
+            Set of file names (empty if the directory does not exist)
+        """
+        try:
+            with os.scandir(directory or ".") as entries:
+                # Symlinks are followed (like Path.exists) so dangling
+                # links to other filesystems don't count as present
+                return {
+                    entry.name
+                    for entry in entries
+                    if not entry.is_symlink() or os.path.exists(entry.path)
+                }
+        except (FileNotFoundError, NotADirectoryError):
+            return set()
 
-    @staticmethod
-    def is_english_tweet(tweet: Tweet) -> bool:
+    @classmethod
+    def index_directories(cls, paths: Iterable[str]) -> Dict[str, Set[str]]:
         """
-        Check if tweet is in English.
+        Scan the parent directories of paths, in parallel when there are several.
+
+        Each directory is listed once; on networked storage the listings are
+        dispatched to a thread pool so their latencies overlap.
 
         Args:
-            tweet: Tweet object with raw_api_data
+            paths: Local file paths (e.g. media.local_path values)
 
         Returns:
-            True if tweet is in English, False otherwise
+            Dictionary mapping normalized directory -> set of file names it contains
+        """
+        # Normalized so "videos", "./videos" and "videos/" share one listing
+        directories = list({os.path.normpath(os.path.dirname(path)) for path in paths})
+        if len(directories) <= 1:
+            return {directory: cls.scan_directory(directory) for directory in directories}
+
+        with ThreadPoolExecutor(
+            max_workers=min(SCAN_MAX_WORKERS, len(directories))
+        ) as executor:
+            return dict(zip(directories, executor.map(cls.scan_directory, directories)))
+
+    @classmethod
+    def video_file_exists(cls, path: str, dir_index: Dict[str, Set[str]]) -> bool:
+        """
+        Check whether a file exists using a per-directory listing cache.
+
+        Directories missing from dir_index are scanned on first use; later
+        checks are set lookups instead of stat() calls.
+
+        Args:
+            path: Local file path (e.g. media.local_path)
+            dir_index: Cache mapping directory -> set of file names, filled in place
+
+        Returns:
+            True if the file exists
         """
-        if not tweet.raw_api_data:
-            # If no API data, can't determine - assume English
-            return True
+        directory, name = os.path.split(path)
+        directory = os.path.normpath(directory)
+        names = dir_index.get(directory)
+        if names is None:
+            names = dir_index[directory] = cls.scan_directory(directory)
+        return name in names
 
-        api_data = tweet.raw_api_data
+    @staticmethod
+    def reservoir_sample(items: Iterable, k: int, rng: random.Random) -> List:
+        """
+        Uniformly sample k items from an iterable in a single pass.
 
-        # Check for lang field
-        lang = None
+        Reservoir sampling with Li's Algorithm L: only the k kept items are
+        held in memory, and instead of drawing a random number per item it
+        jumps a geometrically distributed number of items between
+        replacements (O(k(1 + log(N/k))) draws).
 
-        # Check in root level
-        if isinstance(api_data, dict):
-            lang = api_data.get("lang")
+        Args:
+            items: Iterable of items to sample from
+            k: Number of items to keep
+            rng: Random number generator (seeded for reproducibility)
 
-            # Also check in 'data' if present (some API responses nest it)
-            if not lang and "data" in api_data:
-                if isinstance(api_data["data"], dict):
-                    lang = api_data["data"].get("lang")
+        Returns:
+            List of up to k sampled items (all items if fewer than k)
+        """
+        iterator = iter(items)
+        reservoir = list(islice(iterator, k))
+        if k <= 0 or len(reservoir) < k:
+            return reservoir
+
+        def uniform() -> float:
+            # Open interval (0, 1) so the logarithms below are finite
+            u = rng.random()
+            while u == 0.0:
+                u = rng.random()
+            return u
+
+        w = math.exp(math.log(uniform()) / k)
+        while True:
+            skip = math.floor(math.log(uniform()) / math.log1p(-w))
+            for item in islice(iterator, skip, skip + 1):
+                reservoir[rng.randrange(k)] = item
+                break
+            else:
+                return reservoir
+            w *= math.exp(math.log(uniform()) / k)
+
+    def count_filtered_out(self, session, stmt) -> Dict[str, int]:
+        """
+        Count the tweets each dataset filter removes (for --stats).
+
+        Runs one server-side aggregate over the unfiltered rows of stmt, so
+        it costs a second full scan of the tweet/media join.
+
+        Args:
+            session: Database session
+            stmt: Tweet/media select before the API-data/original/English filters
 
-        # Return True if lang is 'en' or if we can't determine
-        return lang == "en" if lang else True
+        Returns:
+            Dictionary with total, no_api_data, not_original and not_english counts
+        """
+        base = stmt.subquery()
+        has_api_data = base.c.has_api_data
+        is_original = ~base.c.has_referenced_tweets
+        is_english = func.coalesce(base.c.tweet_lang, "en") == "en"
+        counts = session.execute(
+            select(
+                func.count(),
+                func.count().filter(~has_api_data),
+                func.count().filter(has_api_data & ~is_original),
+                func.count().filter(has_api_data & is_original & ~is_english),
+            ).select_from(base)
+        ).one()
+        return {
+            "total": counts[0],
+            "no_api_data": counts[1],
+            "not_original": counts[2],
+            "not_english": counts[3],
+        }
 
-    def load_data_from_database(self, session) -> List[Dict]:
+    def load_data_from_database(self, session, sql_sample: bool = True) -> List[Dict]:
         """
         Load unique tweets from database with their videos and notes.
 
         NEW: Returns one entry per tweet (not per note) with all notes grouped.
         For tweets with multiple videos, only the first video (video_index=1) is used.
 
+        Args:
+            session: Database session
+            sql_sample: Pre-sample tweets in SQL when sample_size is set
+
         Returns:
             List of dictionaries with tweet, media, and associated notes
         """
@@ -138,170 +547,299 @@ class DatasetCreator:
         # 2. At least one note
         # 3. Use only first video (video_index=1) for tweets with multiple videos
         # Note: API data filter removed - now fetched in pipeline step 1.5
-        query = (
-            session.query(Tweet, MediaMetadata)
-            .join(MediaMetadata, Tweet.tweet_id == MediaMetadata.tweet_id)
-            .filter(MediaMetadata.local_path.isnot(None))
-            .filter(MediaMetadata.media_type == "video")
-            .filter(MediaMetadata.video_index == 1)  # Only first video per tweet
+        # Core select of only the columns create_dataset reads: rows come
+        # back as plain tuples, with no ORM entity or Query machinery
+        stmt = (
+            select(*TWEET_COLUMNS, *MEDIA_COLUMNS)
+            .select_from(MediaMetadata)
+            .join(MediaMetadata.tweet)
+            .where(MediaMetadata.local_path.isnot(None))
+            .where(MediaMetadata.media_type == "video")
+            .where(MediaMetadata.video_index == 1)  # Only first video per tweet
         )
 
         # Filter by specific tweet IDs if provided
         if self.tweet_ids:
-            query = query.filter(Tweet.tweet_id.in_(self.tweet_ids))
+            stmt = stmt.where(id_in(Tweet.tweet_id, self.tweet_ids))
             logger.info(f"Filtering to {len(self.tweet_ids)} specific tweet IDs")
 
-        tweet_media_pairs = query.all()
-        logger.info(f"Found {len(tweet_media_pairs)} tweets with downloaded videos")
-
-        # Filter for original English tweets
-        filtered_tweets = []
-        stats = {
-            "total": len(tweet_media_pairs),
-            "not_original": 0,
-            "not_english": 0,
-            "no_file": 0,
-            "no_api_data": 0,
-        }
-
-        for tweet, media in tweet_media_pairs:
-            # Check if video file exists
-            if not Path(media.local_path).exists():
-                logger.warning(f"Video file not found: {media.local_path}")
-                stats["no_file"] += 1
-                continue
+        # Optional per-filter breakdown (--stats): an extra aggregate over
+        # every unfiltered row, so it only runs when asked for
+        filter_counts = None
+        if self.filter_stats:
+            filter_counts = self.count_filtered_out(session, stmt)
+
+        # Filter for original English tweets with API data in SQL, so only
+        # matching rows are transferred; stream them in batches
+        stmt = stmt.where(
+            Tweet.has_api_data,
+            ~Tweet.has_referenced_tweets,
+            func.coalesce(Tweet.tweet_lang, "en") == "en",
+        )
 
-            # Skip tweets without API data (will be logged as warning)
-            if not tweet.raw_api_data:
-                stats["no_api_data"] += 1
-                continue
+        # Pre-sample in SQL: keep only tweets with matching notes, order them
+        # by a seeded hash of the tweet ID and transfer just enough rows
+        sql_limit = None
+        if self.sample_size and sql_sample and not self.tweet_ids:
+            sql_limit = math.ceil(self.sample_size * SQL_SAMPLE_OVERSAMPLE)
+            has_notes = select(Note.note_id).where(Note.tweet_id == Tweet.tweet_id)
+            if self.note_status_filter:
+                has_notes = has_notes.where(
+                    Note.current_status == self.note_status_filter
+                )
+            sample_key = func.md5(
+                cast(Tweet.tweet_id, String) + literal(f":{self.random_seed}")
+            )
+            stmt = (
+                stmt.where(has_notes.exists())
+                .order_by(sample_key)
+                .limit(sql_limit)
+            )
+            logger.info(
+                f"Pre-sampling up to {sql_limit} tweets in SQL (seed={self.random_seed})"
+            )
 
-            # Check if original tweet (not retweet or reply)
-            if not self.is_original_tweet(tweet):
-                stats["not_original"] += 1
-                continue
+        num_tweet_columns = len(TWEET_COLUMNS)
+        rows = session.execute(stmt.execution_options(yield_per=1000)).tuples()
+        candidates = [
+            (
+                TweetRow._make(row[:num_tweet_columns]),
+                MediaRow._make(row[num_tweet_columns:]),
+            )
+            for row in rows
+        ]
+        sql_limit_reached = sql_limit is not None and len(candidates) == sql_limit
 
-            # Check if English
-            if not self.is_english_tweet(tweet):
-                stats["not_english"] += 1
+        # Check if video files exist (parallel per-directory scans)
+        dir_index = self.index_directories(media.local_path for _, media in candidates)
+        filtered_tweets = []
+        missing_files = 0
+        for tweet, media in candidates:
+            if not self.video_file_exists(media.local_path, dir_index):
+                logger.warning(f"Video file not found: {media.local_path}")
+                missing_files += 1
                 continue
-
             filtered_tweets.append((tweet, media))
 
-        logger.info(f"After filtering:")
-        logger.info(f"  ✓ Original tweets (not RT/reply): {len(filtered_tweets)}")
-        logger.info(f"  ✗ Filtered out {stats['not_original']} retweets/replies")
-        logger.info(f"  ✗ Filtered out {stats['not_english']} non-English tweets")
-        logger.info(f"  ✗ Skipped {stats['no_file']} missing video files")
-        if stats["no_api_data"] > 0:
-            logger.warning(
-                f"  ✗ Skipped {stats['no_api_data']} tweets without API data"
+        # With SQL pre-sampling the rows below are the hash-ordered sample
+        # (at most sql_limit tweets), not every eligible tweet
+        scope = "pre-sampled " if sql_limit is not None else ""
+        if filter_counts:
+            logger.info(
+                f"Found {filter_counts['total']} tweets with downloaded videos"
+                f"{' (before sampling)' if sql_limit is not None else ''}"
+            )
+            logger.info(f"  ✗ Filtered out {filter_counts['not_original']} retweets/replies")
+            logger.info(f"  ✗ Filtered out {filter_counts['not_english']} non-English tweets")
+            if filter_counts["no_api_data"] > 0:
+                logger.warning(
+                    f"  ✗ Skipped {filter_counts['no_api_data']} tweets without API data"
+                )
+        logger.info(
+            f"Found {len(candidates)} {scope}original English tweets with downloaded videos"
+        )
+        if sql_limit is not None:
+            logger.info(
+                f"  (SQL pre-sample: at most {sql_limit} of the eligible tweets)"
             )
+        logger.info(f"  ✗ Skipped {missing_files} missing video files")
+        logger.info(f"  ✓ Usable tweets: {len(filtered_tweets)}")
 
         # Now fetch all notes for these tweets
         tweet_ids = [tweet.tweet_id for tweet, _ in filtered_tweets]
 
         # Query all notes for these tweets
-        notes_query = (
-            session.query(Note)
-            .filter(Note.tweet_id.in_(tweet_ids))
-            .order_by(Note.tweet_id, Note.created_at_millis)
-        )
-
-        # Apply note status filter if specified
         if self.note_status_filter:
-            notes_query = notes_query.filter(
-                Note.current_status == self.note_status_filter
-            )
             logger.info(f"Filtering notes by status: {self.note_status_filter}")
+        if USE_RAW_DBAPI:
+            note_stream = self.load_notes_dbapi(session, tweet_ids)
+        else:
+            note_stream = self.load_notes_orm(session, tweet_ids)
 
-        all_notes = notes_query.all()
+        # Group notes by tweet_id while streaming (query is ordered by tweet_id)
+        notes_by_tweet = {
+            tweet_id: list(notes)
+            for tweet_id, notes in groupby(note_stream, key=attrgetter("tweet_id"))
+        }
+        total_notes = sum(len(notes) for notes in notes_by_tweet.values())
         logger.info(
-            f"Found {len(all_notes)} total notes for {len(filtered_tweets)} tweets"
+            f"Found {total_notes} total notes for {len(filtered_tweets)} {scope}tweets"
         )
 
-        # Group notes by tweet_id
-        from collections import defaultdict
-
-        notes_by_tweet = defaultdict(list)
-        for note in all_notes:
-            notes_by_tweet[note.tweet_id].append(note)
-
         # Build final data structure: one entry per tweet with notes array
         # Only include tweets that have matching notes
-        data = []
-        skipped_no_matching_notes = 0
-        for tweet, media in filtered_tweets:
-            notes = notes_by_tweet.get(tweet.tweet_id, [])
-            if not notes:
-                skipped_no_matching_notes += 1
-                continue
+        candidate_stats = {"matched": 0, "no_matching_notes": 0}
+
+        def iter_candidates():
+            for tweet, media in filtered_tweets:
+                notes = notes_by_tweet.get(tweet.tweet_id)
+                if not notes:
+                    candidate_stats["no_matching_notes"] += 1
+                    continue
+                candidate_stats["matched"] += 1
+                yield tweet, media, notes
+
+        # Apply random sampling if requested (single pass, O(sample_size) memory;
+        # data dicts are only built for the kept tweets)
+        if self.sample_size:
+            candidates = self.reservoir_sample(
+                iter_candidates(), self.sample_size, random.Random(self.random_seed)
+            )
+        else:
+            candidates = list(iter_candidates())
 
-            data.append(
-                {
-                    "tweet": tweet,
-                    "media": media,
-                    "notes": notes,  # Array of Note objects
-                }
+        # Too many pre-sampled tweets were dropped: redo without the SQL limit
+        if sql_limit_reached and len(candidates) < self.sample_size:
+            logger.warning(
+                f"Only {len(candidates)} of {sql_limit} pre-sampled tweets usable, "
+                f"reloading without SQL sampling"
             )
+            return self.load_data_from_database(session, sql_sample=False)
 
         logger.info(
-            f"Final dataset: {len(data)} tweets with {len(all_notes)} total notes"
+            f"Matched {candidate_stats['matched']} {scope}tweets with {total_notes} total notes"
         )
-        if skipped_no_matching_notes > 0:
+        if candidate_stats["no_matching_notes"] > 0:
             logger.info(
-                f"  ✗ Skipped {skipped_no_matching_notes} tweets with no matching notes"
+                f"  ✗ Skipped {candidate_stats['no_matching_notes']} {scope}tweets with no matching notes"
             )
-        if len(data) > 0:
-            logger.info(f"  Average notes per tweet: {len(all_notes) / len(data):.2f}")
-
-        # Apply random sampling if requested
-        if self.sample_size and self.sample_size < len(data):
-            import random
-
-            random.seed(self.random_seed)
-            data = random.sample(data, self.sample_size)
+        if candidate_stats["matched"] > 0:
+            logger.info(
+                f"  Average notes per tweet: {total_notes / candidate_stats['matched']:.2f}"
+            )
+        if self.sample_size and self.sample_size < candidate_stats["matched"]:
             logger.info(
                 f"✓ Randomly sampled {self.sample_size} tweets (seed={self.random_seed})"
             )
 
+        # Only the selected tweets are turned into data dicts
+        data = [
+            {
+                "tweet": tweet,
+                "media": media,
+                "notes": notes,  # Array of Note objects
+            }
+            for tweet, media, notes in candidates
+        ]
+
         return data
 
-    def fetch_missing_tweet_data(self, session, data: List[Dict]) -> int:
+    def load_notes_orm(self, session, tweet_ids: List[int]) -> Iterator[Note]:
+        """
+        Stream notes for the given tweets through the ORM.
+
+        Args:
+            session: Database session
+            tweet_ids: Tweet IDs to load notes for
+
+        Returns:
+            Iterator of Note objects ordered by tweet_id, created_at_millis,
+            fetched in batches of NOTES_BATCH_SIZE
+        """
+        notes_query = (
+            session.query(Note)
+            .options(load_only(*NOTE_COLUMNS))
+            .filter(id_in(Note.tweet_id, tweet_ids))
+            .order_by(Note.tweet_id, Note.created_at_millis)
+        )
+
+        # Apply note status filter if specified
+        if self.note_status_filter:
+            notes_query = notes_query.filter(
+                Note.current_status == self.note_status_filter
+            )
+
+        return iter(notes_query.yield_per(NOTES_BATCH_SIZE))
+
+    def load_notes_dbapi(self, session, tweet_ids: List[int]) -> Iterator[NoteRow]:
+        """
+        Stream notes for the given tweets with a raw DB-API cursor.
+
+        The notes query is a flat scan of simple columns, so it skips the
+        ORM entirely and yields lightweight NoteRow tuples that expose the
+        same attribute names create_dataset reads from Note objects. A named
+        (server-side) psycopg2 cursor fetches NOTES_BATCH_SIZE rows at a time.
+
+        Args:
+            session: Database session
+            tweet_ids: Tweet IDs to load notes for
+
+        Yields:
+            NoteRow tuples ordered by tweet_id, created_at_millis
+        """
+        sql = NOTES_SQL
+        params = {
+            "misleading": MISLEADING_CLASSIFICATION,
+            "note_url_prefix": NOTE_URL_PREFIX,
+            "tweet_ids": tweet_ids,
+        }
+        if self.note_status_filter:
+            sql += " AND current_status = %(status)s"
+            params["status"] = self.note_status_filter
+        sql += " ORDER BY tweet_id, created_at_millis"
+
+        cursor = session.connection().connection.cursor(name="dataset_notes")
+        cursor.itersize = NOTES_BATCH_SIZE
+        try:
+            cursor.execute(sql, params)
+            for row in cursor:
+                yield NoteRow._make(row)
+        finally:
+            cursor.close()
+
+    def fetch_missing_tweet_data(self, session, data: List[Dict]) -> Dict[str, Dict]:
         """
         Fetch tweet API data for tweets that don't have it yet.
 
         NOTE: With new filtering, this should rarely be needed since we require API data.
 
+        Only the fetched tweets are re-selected, and their rows in data are
+        replaced in place, so the whole dataset does not have to be reloaded.
+
         Args:
             session: Database session
             data: List of data dicts from load_data_from_database (new structure)
 
         Returns:
-            Number of tweets fetched
+            Dictionary mapping fetched tweet_id to its API data
         """
-        # Find tweet IDs without raw_api_data
-        tweets_without_api = [
-            str(d["tweet"].tweet_id) for d in data if d["tweet"].raw_api_data is None
-        ]
-
-        if not tweets_without_api:
+        # load_data_from_database already requires API data, so the usual
+        # case is an early exit at the first scan
+        if all(d["tweet"].has_api_data for d in data):
             logger.info("All tweets already have API data")
-            return 0
+            return {}
+
+        # Find tweet IDs without raw_api_data (ints; stringified only for the API)
+        tweets_without_api = {
+            d["tweet"].tweet_id for d in data if not d["tweet"].has_api_data
+        }
 
         logger.info(f"Found {len(tweets_without_api)} tweets without API data")
 
         if not self.twitter.is_available():
             logger.warning("Twitter API not available - skipping API fetch")
-            return 0
+            return {}
 
         logger.info("Fetching missing tweet data from Twitter API...")
-        self.twitter.fetch_tweets(tweets_without_api, save_to_db=True)
+        fetched = self.twitter.fetch_tweets(
+            [str(tweet_id) for tweet_id in tweets_without_api],
+            batch_size=100,
+            save_to_db=True,
+            max_workers=API_MAX_WORKERS,
+        )
 
-        # Refresh the session to get updated data
-        session.expire_all()
+        # Refresh only the updated tweets
+        if fetched:
+            refreshed = {
+                row.tweet_id: TweetRow._make(row)
+                for row in session.execute(
+                    select(*TWEET_COLUMNS).where(id_in(Tweet.tweet_id, fetched.keys()))
+                )
+            }
+            for d in data:
+                d["tweet"] = refreshed.get(d["tweet"].tweet_id, d["tweet"])
 
-        return len(tweets_without_api)
+        return fetched
 
     def create_dataset(self, data: List[Dict]) -> List[Dict]:
         """
@@ -315,53 +853,43 @@ class DatasetCreator:
         Returns:
             List of dataset entries (one per tweet)
         """
-        dataset = []
+        return list(self.iter_dataset(data))
+
+    def iter_dataset(self, data: List[Dict]) -> Iterator[Dict]:
+        """
+        Yield dataset entries one at a time (see create_dataset).
+
+        Lets save_dataset stream entries straight to disk without keeping
+        the whole nested dataset in memory.
+
+        Args:
+            data: List of dicts with 'media', 'tweet', 'notes' keys (notes is array)
+
+        Yields:
+            Dataset entries (one per tweet)
+        """
+        # One creation timestamp shared by every entry of this dataset
+        created_at = datetime.now().isoformat()
 
         for idx, record in enumerate(data, 1):
             media = record["media"]
             tweet = record["tweet"]
             notes = record["notes"]  # Array of Note objects
 
+            # Values used more than once below are read/formatted once
+            sample_id = f"video_{idx:03d}"
+            tweet_id = str(tweet.tweet_id)
+
             # Get filename from local_path
-            video_path = Path(media.local_path) if media.local_path else None
-            filename = video_path.name if video_path else f"video_{idx:03d}"
+            local_path = media.local_path
+            filename = os.path.basename(local_path) if local_path else sample_id
 
             # Convert duration from ms to seconds
-            duration_seconds = media.duration_ms / 1000.0 if media.duration_ms else 0
+            duration_ms = media.duration_ms
+            duration_seconds = duration_ms / 1000.0 if duration_ms else 0
 
             # Build community notes array
-            community_notes = []
-            for note in notes:
-                note_entry = {
-                    "note_id": str(note.note_id),
-                    "note_url": note.note_url
-                    or f"https://twitter.com/i/birdwatch/n/{note.note_id}",
-                    "classification": note.classification or "",
-                    "summary": note.summary or "",
-                    "is_misleading": note.classification
-                    == "MISINFORMED_OR_POTENTIALLY_MISLEADING",
-                    "created_at_millis": note.created_at_millis,
-                    "current_status": note.current_status or "",  # NEW FIELD
-                    "reasons": {
-                        "factual_error": note.misleading_factual_error or 0,
-                        "manipulated_media": note.misleading_manipulated_media or 0,
-                        "missing_context": note.misleading_missing_important_context
-                        or 0,
-                        "outdated_info": note.misleading_outdated_information or 0,
-                        "unverified_claim": note.misleading_unverified_claim_as_fact
-                        or 0,
-                        "satire": note.misleading_satire or 0,
-                    },
-                    "not_misleading_reasons": {
-                        "factually_correct": note.not_misleading_factually_correct or 0,
-                        "clearly_satire": note.not_misleading_clearly_satire or 0,
-                        "personal_opinion": note.not_misleading_personal_opinion or 0,
-                    },
-                    "believable": note.believable,
-                    "harmful": note.harmful,
-                    "validation_difficulty": note.validation_difficulty,
-                }
-                community_notes.append(note_entry)
+            community_notes = [note_entry(note) for note in notes]
 
             # Build entry (one per tweet with notes array)
             entry = {
@@ -369,16 +897,15 @@ class DatasetCreator:
                     "filename": filename,
                     "index": idx,
                     "duration_seconds": duration_seconds,
-                    "path": str(video_path) if video_path else "",
+                    "path": local_path or "",
                     "title": media.title or "",
                     "uploader": media.uploader or "",
                     "width": media.width,
                     "height": media.height,
                 },
                 "tweet": {
-                    "tweet_id": str(tweet.tweet_id),
-                    "url": tweet.tweet_url
-                    or f"https://twitter.com/i/status/{tweet.tweet_id}",
+                    "tweet_id": tweet_id,
+                    "url": tweet.tweet_url,
                     "text": tweet.text or "",
                     "author_name": tweet.author_name or "",
                     "author_username": tweet.author_username or "",
@@ -395,130 +922,120 @@ class DatasetCreator:
                 },
                 "community_notes": community_notes,  # Array instead of single object
                 "metadata": {
-                    "sample_id": f"video_{idx:03d}",
-                    "tweet_id": str(tweet.tweet_id),  # NEW: explicit tweet_id
+                    "sample_id": sample_id,
+                    "tweet_id": tweet_id,  # NEW: explicit tweet_id
                     "num_notes": len(community_notes),  # NEW: number of notes
-                    "has_api_data": tweet.raw_api_data is not None,
+                    "has_api_data": tweet.has_api_data,
                     "is_original_tweet": True,  # All filtered to be original
                     "is_english": True,  # All filtered to be English
-                    "created_at": datetime.now().isoformat(),
+                    "created_at": created_at,
                     "media_type": media.media_type,
                 },
             }
 
-            dataset.append(entry)
+            yield entry
 
-        return dataset
+    @staticmethod
+    def compute_statistics(data: List[Dict]) -> Dict:
+        """
+        Compute dataset statistics in a single pass over the database records.
 
-    def save_dataset(self, dataset: List[Dict]):
-        """Save dataset in multiple formats with timestamp and latest symlink."""
-        # Calculate statistics
-        total_notes = sum(len(d["community_notes"]) for d in dataset)
+        Works on the load_data_from_database records rather than the built
+        entries, so the statistics are known before any entry is created and
+        the entries can be streamed to disk.
 
-        # Count notes by status
-        from collections import Counter
+        Args:
+            data: List of dicts with 'media', 'tweet', 'notes' keys
 
+        Returns:
+            Dictionary with total_tweets, total_notes, status_counts (Counter),
+            misleading_notes, with_api_data and total_duration
+        """
+        total_notes = 0
+        misleading_notes = 0
+        with_api_data = 0
+        total_duration = 0.0
         status_counts = Counter()
-        for entry in dataset:
-            for note in entry["community_notes"]:
-                status = note.get("current_status", "UNKNOWN")
-                status_counts[status] += 1
-
-        # Count misleading notes
-        misleading_notes = sum(
-            1 for d in dataset for note in d["community_notes"] if note["is_misleading"]
-        )
+
+        for record in data:
+            duration_ms = record["media"].duration_ms
+            if duration_ms:
+                total_duration += duration_ms / 1000.0
+            if record["tweet"].has_api_data:
+                with_api_data += 1
+            for note in record["notes"]:
+                total_notes += 1
+                status_counts[note.current_status or ""] += 1
+                if note.is_misleading:
+                    misleading_notes += 1
+
+        return {
+            "total_tweets": len(data),
+            "total_notes": total_notes,
+            "status_counts": status_counts,
+            "misleading_notes": misleading_notes,
+            "with_api_data": with_api_data,
+            "total_duration": total_duration,
+        }
+
+    def save_dataset(self, dataset: Iterable[Dict], stats: Dict):
+        """
+        Save dataset in multiple formats with timestamp and latest symlink.
+
+        Args:
+            dataset: Dataset entries (list from create_dataset or the
+                iter_dataset generator); consumed once
+            stats: compute_statistics result for the same records
+        """
+        total_tweets = stats["total_tweets"]
+        total_notes = stats["total_notes"]
 
         # Create timestamp for this dataset
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        now = datetime.now()
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
 
-        # Create datasets directory if it doesn't exist
+        # Create datasets directory if it doesn't exist (also creates output_dir)
         datasets_dir = self.output_dir / "datasets"
         datasets_dir.mkdir(parents=True, exist_ok=True)
 
-        # Main JSON file
-        output = {
+        # Main JSON file (samples are streamed separately, see write_dataset_json)
+        header = {
             "dataset_info": {
                 "name": "Video LLM Misinformation Evaluation Dataset",
                 "description": "Videos with tweets and community notes for misinformation detection (one record per tweet)",
                 "version": "3.0",  # Updated version
-                "created": datetime.now().isoformat(),
+                "created": now.isoformat(),
                 "timestamp": timestamp,
-                "total_tweets": len(dataset),
+                "total_tweets": total_tweets,
                 "total_notes": total_notes,
                 "note_status_filter": self.note_status_filter or "None",
             },
             "statistics": {
-                "total_tweets": len(dataset),
+                "total_tweets": total_tweets,
                 "total_notes": total_notes,
-                "avg_notes_per_tweet": total_notes / len(dataset) if dataset else 0,
-                "misleading_notes": misleading_notes,
-                "with_api_data": len(dataset),  # All have API data now
+                "avg_notes_per_tweet": total_notes / total_tweets if total_tweets else 0,
+                "misleading_notes": stats["misleading_notes"],
+                "with_api_data": stats["with_api_data"],
                 "all_original_tweets": True,
                 "all_english_tweets": True,
-                "note_status_breakdown": dict(status_counts),
-                "total_duration": sum(d["video"]["duration_seconds"] for d in dataset),
+                "note_status_breakdown": dict(stats["status_counts"]),
+                "total_duration": stats["total_duration"],
             },
-            "samples": dataset,
         }
 
         # Create timestamped directory for this dataset
         dataset_dir = datasets_dir / f"dataset_{timestamp}"
         dataset_dir.mkdir(parents=True, exist_ok=True)
 
-        # Save JSON in timestamped directory
+        # Save JSON and CSV (one row per tweet) in one streaming pass
         json_file = dataset_dir / "dataset.json"
-        with open(json_file, "w", encoding="utf-8") as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
+        csv_file = dataset_dir / "dataset.csv"
+        csv_saved = write_dataset_files(json_file, csv_file, header, dataset)
         logger.info(f"✓ Saved: {json_file}")
-
-        # Save CSV - one row per tweet with comma-separated note info
-        try:
-            import pandas as pd
-
-            flattened = []
-            for entry in dataset:
-                # Create one row per tweet with comma-separated note fields
-                note_ids = ",".join(
-                    note["note_id"] for note in entry["community_notes"]
-                )
-                note_statuses = ",".join(
-                    note.get("current_status", "") or "UNKNOWN"
-                    for note in entry["community_notes"]
-                )
-                note_classifications = ",".join(
-                    note["classification"] or "" for note in entry["community_notes"]
-                )
-                is_misleading_flags = ",".join(
-                    str(note["is_misleading"]) for note in entry["community_notes"]
-                )
-
-                flat = {
-                    "sample_id": entry["metadata"]["sample_id"],
-                    "tweet_id": entry["tweet"]["tweet_id"],
-                    "tweet_url": entry["tweet"]["url"],
-                    "tweet_text": entry["tweet"]["text"],
-                    "tweet_author": entry["tweet"]["author_username"],
-                    "tweet_likes": entry["tweet"]["engagement"]["likes"],
-                    "tweet_created_at": entry["tweet"]["created_at"],
-                    "video_filename": entry["video"]["filename"],
-                    "video_duration": entry["video"]["duration_seconds"],
-                    "num_notes": len(entry["community_notes"]),
-                    "note_ids": note_ids,
-                    "note_current_status": note_statuses,
-                    "note_classifications": note_classifications,
-                    "is_misleading": is_misleading_flags,
-                }
-                flattened.append(flat)
-
-            csv_file = dataset_dir / "dataset.csv"
-            df = pd.DataFrame(flattened)
-            df.to_csv(csv_file, index=False, encoding="utf-8")
+        if csv_saved:
             logger.info(
-                f"✓ Saved: {csv_file} ({len(flattened)} rows = tweets, {total_notes} notes)"
+                f"✓ Saved: {csv_file} ({total_tweets} rows = tweets, {total_notes} notes)"
             )
-        except Exception as e:
-            logger.warning(f"Could not save CSV: {e}")
 
         # Create 'latest' symlink directory
         latest_dir = self.output_dir / "latest"
@@ -528,14 +1045,10 @@ class DatasetCreator:
             if latest_dir.is_symlink():
                 latest_dir.unlink()
             else:
-                import shutil
-
                 shutil.rmtree(latest_dir)
 
         # Create symlink to latest dataset directory
         try:
-            import os
-
             os.symlink(
                 f"datasets/dataset_{timestamp}", latest_dir, target_is_directory=True
             )
@@ -546,8 +1059,6 @@ class DatasetCreator:
             # Symlinks might not work on Windows, so copy files instead
             logger.warning(f"Could not create symlink (using copy instead): {e}")
             latest_dir.mkdir(exist_ok=True)
-            import shutil
-
             shutil.copy2(json_file, latest_dir / "dataset.json")
             if csv_file.exists():
                 shutil.copy2(csv_file, latest_dir / "dataset.csv")
@@ -585,52 +1096,51 @@ class DatasetCreator:
                 if use_api:
                     logger.info("\n🔑 Checking for missing tweet API data...")
                     fetched = self.fetch_missing_tweet_data(session, data)
-                    if fetched > 0:
-                        logger.info(f"Fetched API data for {fetched} tweets")
-                        # Reload data to get updated tweet info
-                        data = self.load_data_from_database(session)
+                    if fetched:
+                        logger.info(f"Fetched API data for {len(fetched)} tweets")
+                        # Tweets were refreshed in place; re-apply the
+                        # original/English filters to the updated ones only
+                        fetched_ids = {int(tweet_id) for tweet_id in fetched}
+                        data = [
+                            d
+                            for d in data
+                            if d["tweet"].tweet_id not in fetched_ids
+                            or (
+                                self.is_original_tweet(d["tweet"])
+                                and self.is_english_tweet(d["tweet"])
+                            )
+                        ]
 
                 # Create dataset
                 logger.info("\n🔨 Creating dataset...")
-                dataset = self.create_dataset(data)
-                total_notes = sum(len(d["community_notes"]) for d in dataset)
+                # Statistics come from the records, so entries can be
+                # generated lazily and streamed straight into the files
+                stats = self.compute_statistics(data)
+                total_tweets = stats["total_tweets"]
+                total_notes = stats["total_notes"]
                 logger.info(
-                    f"Created {len(dataset)} tweet records with {total_notes} total notes"
+                    f"Creating {total_tweets} tweet records with {total_notes} total notes"
                 )
 
                 # Save
                 logger.info("\n💾 Saving dataset...")
-                self.save_dataset(dataset)
+                self.save_dataset(self.iter_dataset(data), stats)
 
                 # Summary
                 logger.info("\n" + "=" * 70)
                 logger.info("✅ SUCCESS!")
                 logger.info("=" * 70)
-                logger.info(f"Total tweets: {len(dataset)}")
+                logger.info(f"Total tweets: {total_tweets}")
                 logger.info(f"Total notes: {total_notes}")
                 logger.info(
-                    f"Average notes per tweet: {total_notes / len(dataset):.2f}"
+                    f"Average notes per tweet: {total_notes / total_tweets:.2f}"
                 )
 
-                # Count notes by status
-                from collections import Counter
-
-                status_counts = Counter()
-                for entry in dataset:
-                    for note in entry["community_notes"]:
-                        status_counts[note.get("current_status", "UNKNOWN")] += 1
-
                 logger.info("\nNote status breakdown:")
-                for status, count in status_counts.most_common():
+                for status, count in stats["status_counts"].most_common():
                     logger.info(f"  {status}: {count}")
 
-                misleading_notes = sum(
-                    1
-                    for d in dataset
-                    for note in d["community_notes"]
-                    if note["is_misleading"]
-                )
-                logger.info(f"\nMisleading notes: {misleading_notes}")
+                logger.info(f"\nMisleading notes: {stats['misleading_notes']}")
                 logger.info(f"All tweets are original (no retweets/replies): ✓")
                 logger.info(f"All tweets are in English: ✓")
                 logger.info(f"\nOutput:")
@@ -691,6 +1201,11 @@ def main():
         default=None,
         help="Path to file containing tweet IDs to include (one per line)",
     )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Log how many tweets each filter removes (runs an extra count query)",
+    )
     args = parser.parse_args()
 
     # Load tweet IDs from file if provided
@@ -711,6 +1226,7 @@ def main():
         random_seed=args.random_seed,
         note_status_filter=args.note_status,
         tweet_ids=tweet_ids,
+        filter_stats=args.stats,
     )
     success = creator.run(use_api=not args.no_api)
 
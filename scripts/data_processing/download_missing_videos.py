@@ -2,6 +2,10 @@
 """
 Download videos for tweets that have API data but are missing videos or media_metadata.
 Useful for catching up on videos that weren't downloaded yet.
+
+Lookups, media_metadata inserts and the video download all run in this
+process and share the pooled engine from database.config (QueuePool with
+pre-ping). Tune the pool with DB_POOL_SIZE / DB_MAX_OVERFLOW.
 """
 
 import sys
@@ -12,8 +16,11 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 import logging
 import argparse
+from sqlalchemy import exists, insert, or_, select
 from sqlalchemy.orm import Session
 from database import get_session, Tweet, MediaMetadata, Note
+from database.queries import id_in
+from scripts.data_processing.download_videos import download_videos
 
 logging.basicConfig(
     level=logging.INFO,
@@ -21,11 +28,27 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Rows per bulk INSERT of new media_metadata entries
+INSERT_BATCH_SIZE = 1000
+
+# Server-side JSONB check (@> containment) that an API payload lists at least
+# one video in includes.media, at the root or under raw_response; payloads
+# without videos are never sent to Python
+_VIDEO_MEDIA = [{"type": "video"}]
+HAS_VIDEO_MEDIA = or_(
+    Tweet.raw_api_data["includes"]["media"].contains(_VIDEO_MEDIA),
+    Tweet.raw_api_data["raw_response"]["includes"]["media"].contains(_VIDEO_MEDIA),
+)
+
 
 def find_tweets_with_missing_videos(session, note_status=None):
     """
     Find tweets that have API data but are missing downloaded videos.
 
+    Both subqueries probe by tweet_id, which is indexed on media_metadata and
+    notes; on large tables a composite (tweet_id, media_type, local_path)
+    index on media_metadata would let the video check run index-only.
+
     Args:
         session: Database session
         note_status: Optional filter for note status (e.g., CURRENTLY_RATED_HELPFUL)
@@ -38,23 +61,30 @@ def find_tweets_with_missing_videos(session, note_status=None):
     # 2. Have notes
     # 3. Have media_metadata indicating videos exist
     # 4. But don't have local_path set (video not downloaded)
-    query = (
-        session.query(Tweet.tweet_id)
-        .join(MediaMetadata, Tweet.tweet_id == MediaMetadata.tweet_id)
-        .join(Note, Tweet.tweet_id == Note.tweet_id)
-        .filter(Tweet.raw_api_data.isnot(None))
-        .filter(MediaMetadata.media_type == "video")
-        .filter(MediaMetadata.local_path.is_(None))
-        .filter(Tweet.raw_api_data["referenced_tweets"].astext.is_(None))
-        .distinct()
+    #
+    # EXISTS semi-joins: each tweet is returned once without joining every
+    # note x video row and de-duplicating them with DISTINCT
+    missing_video = exists().where(
+        MediaMetadata.tweet_id == Tweet.tweet_id,
+        MediaMetadata.media_type == "video",
+        MediaMetadata.local_path.is_(None),
     )
+    has_note = exists().where(Note.tweet_id == Tweet.tweet_id)
 
     # Optionally filter by note status
     if note_status:
-        query = query.filter(Note.current_status == note_status)
+        has_note = has_note.where(Note.current_status == note_status)
+
+    stmt = (
+        select(Tweet.tweet_id)
+        .where(Tweet.raw_api_data.isnot(None))
+        .where(Tweet.raw_api_data["referenced_tweets"].astext.is_(None))
+        .where(missing_video)
+        .where(has_note)
+    )
 
-    tweet_ids = [row.tweet_id for row in query.all()]
-    return tweet_ids
+    # Single-column result: take the scalars, no Row object per tweet
+    return session.scalars(stmt).all()
 
 
 def find_tweets_without_media_metadata(session, note_status=None):
@@ -68,8 +98,6 @@ def find_tweets_without_media_metadata(session, note_status=None):
     Returns:
         List of tweet IDs
     """
-    from sqlalchemy import exists
-
     # Subquery to check if tweet has any media_metadata
     has_media_metadata = exists().where(MediaMetadata.tweet_id == Tweet.tweet_id)
 
@@ -77,20 +105,21 @@ def find_tweets_without_media_metadata(session, note_status=None):
     # 1. Have API data
     # 2. Have notes
     # 3. Do NOT have any media_metadata entries
-    query = (
-        session.query(Tweet.tweet_id)
-        .join(Note, Tweet.tweet_id == Note.tweet_id)
-        .filter(Tweet.raw_api_data.isnot(None))
-        .filter(Tweet.raw_api_data["referenced_tweets"].astext.is_(None))
-        .filter(~has_media_metadata)
-        .distinct()
-    )
-
+    #
+    # Semi-join on notes (EXISTS) instead of JOIN + DISTINCT
+    has_note = exists().where(Note.tweet_id == Tweet.tweet_id)
     if note_status:
-        query = query.filter(Note.current_status == note_status)
+        has_note = has_note.where(Note.current_status == note_status)
+
+    stmt = (
+        select(Tweet.tweet_id)
+        .where(Tweet.raw_api_data.isnot(None))
+        .where(Tweet.raw_api_data["referenced_tweets"].astext.is_(None))
+        .where(~has_media_metadata)
+        .where(has_note)
+    )
 
-    tweet_ids = [row.tweet_id for row in query.all()]
-    return tweet_ids
+    return session.scalars(stmt).all()
 
 
 def _extract_tweet_payload(api_data: dict, tweet_id: int) -> dict:
@@ -101,12 +130,14 @@ def _extract_tweet_payload(api_data: dict, tweet_id: int) -> dict:
     if "attachments" in api_data or "referenced_tweets" in api_data:
         return api_data
 
+    tweet_id_str = str(tweet_id)  # API ids are strings; convert once
+
     data = api_data.get("data")
     if isinstance(data, dict):
         return data
     if isinstance(data, list):
         for item in data:
-            if str(item.get("id")) == str(tweet_id):
+            if str(item.get("id")) == tweet_id_str:
                 return item
 
     raw_response = api_data.get("raw_response")
@@ -116,7 +147,7 @@ def _extract_tweet_payload(api_data: dict, tweet_id: int) -> dict:
             return data
         if isinstance(data, list):
             for item in data:
-                if str(item.get("id")) == str(tweet_id):
+                if str(item.get("id")) == tweet_id_str:
                     return item
 
     return {}
@@ -145,21 +176,35 @@ def extract_video_info_from_api_data(session: Session, tweet_ids: list) -> int:
         Number of media_metadata entries created
     """
     created_count = 0
+    new_rows = []
 
-    for tweet_id in tweet_ids:
-        tweet = session.query(Tweet).filter(Tweet.tweet_id == tweet_id).first()
+    # Two bulk queries instead of two per tweet: the API payloads, and the
+    # (tweet_id, video_index) pairs that already have media_metadata
+    api_data_rows = (
+        session.query(Tweet.tweet_id, Tweet.raw_api_data)
+        .filter(id_in(Tweet.tweet_id, tweet_ids))
+        .filter(Tweet.raw_api_data.isnot(None))
+        .filter(HAS_VIDEO_MEDIA)
+        .yield_per(1000)
+    )
+    existing_media = set(
+        session.execute(
+            select(MediaMetadata.tweet_id, MediaMetadata.video_index).where(
+                id_in(MediaMetadata.tweet_id, tweet_ids)
+            )
+        ).tuples()
+    )
 
-        if not tweet or not tweet.raw_api_data:
+    for tweet_id, api_data in api_data_rows:
+        if not api_data:
             continue
 
-        api_data = tweet.raw_api_data
-
         tweet_payload = _extract_tweet_payload(api_data, tweet_id)
         if not tweet_payload:
             continue
 
-        attachments = tweet_payload.get("attachments", {})
-        media_keys = attachments.get("media_keys", []) if attachments else []
+        attachments = tweet_payload.get("attachments") or {}
+        media_keys = attachments.get("media_keys") or ()
         if not media_keys:
             continue
 
@@ -174,52 +219,49 @@ def extract_video_info_from_api_data(session: Session, tweet_ids: list) -> int:
             if isinstance(media, dict)
         }
 
-        video_index = 1
-        for media_key in media_keys:
-            media = media_by_key.get(media_key)
-            if not media:
-                continue
-            if media.get("type") != "video":
-                continue
+        # Video items in attachment order; video_index numbers videos only
+        videos = [
+            media
+            for media in map(media_by_key.get, media_keys)
+            if media and media.get("type") == "video"
+        ]
+        if not videos:
+            continue
+
+        for video_index, media in enumerate(videos, 1):
+            media_get = media.get  # Bound once for the lookups below
 
             # Create composite media_key
             media_key = f"{tweet_id}_{video_index}"
 
             # Check if media_metadata already exists
-            existing = (
-                session.query(MediaMetadata)
-                .filter(
-                    MediaMetadata.tweet_id == tweet_id,
-                    MediaMetadata.video_index == video_index,
-                )
-                .first()
-            )
-
-            if existing:
+            if (tweet_id, video_index) in existing_media:
                 continue
 
-            # Create new media_metadata entry
-            media_metadata = MediaMetadata(
-                media_key=media_key,
-                tweet_id=tweet_id,
-                video_index=video_index,
-                media_type="video",
-                media_url=media.get("url"),
-                duration_ms=media.get("duration_ms"),
-                height=media.get("height"),
-                width=media.get("width"),
-                preview_image_url=media.get("preview_image_url"),
-                view_count=media.get("public_metrics", {}).get("view_count"),
-                local_path=None,  # Will be set when video is downloaded
+            # New media_metadata row (inserted in bulk below)
+            new_rows.append(
+                {
+                    "media_key": media_key,
+                    "tweet_id": tweet_id,
+                    "video_index": video_index,
+                    "media_type": "video",
+                    "duration_ms": media_get("duration_ms"),
+                    "height": media_get("height"),
+                    "width": media_get("width"),
+                    "local_path": None,  # Will be set when video is downloaded
+                }
             )
-
-            session.add(media_metadata)
             created_count += 1
-            logger.info(
-                f"Created media_metadata for tweet {tweet_id} (index {video_index})"
+            # Per-row detail at DEBUG with lazy formatting; main() logs the total
+            logger.debug(
+                "Created media_metadata for tweet %s (index %s)", tweet_id, video_index
             )
-            video_index += 1
 
+    # Multi-row INSERTs (executemany) instead of one INSERT per ORM object
+    for start in range(0, len(new_rows), INSERT_BATCH_SIZE):
+        session.execute(
+            insert(MediaMetadata), new_rows[start : start + INSERT_BATCH_SIZE]
+        )
     session.commit()
     return created_count
 
@@ -343,49 +385,22 @@ def main():
         logger.info(f"\nTotal: {len(all_tweet_ids)} tweets")
         return 0
 
-    # Write tweet IDs to temporary file
-    temp_file = Path("data/temp_missing_videos.txt")
-    temp_file.parent.mkdir(parents=True, exist_ok=True)
-
-    with open(temp_file, "w") as f:
-        for tweet_id in all_tweet_ids:
-            f.write(f"{tweet_id}\n")
-
-    logger.info(f"Saved tweet IDs to {temp_file}")
-
-    # Call download_videos.py with the tweet IDs
-    import subprocess
-
-    cmd = [
-        sys.executable,
-        "scripts/data_processing/download_videos.py",
-        "--tweet-ids-file",
-        str(temp_file),
-    ]
-
-    if args.limit:
-        cmd.extend(["--limit", str(args.limit)])
-
-    if args.force:
-        cmd.append("--force")
-
     logger.info("\nStarting video download...")
     logger.info("=" * 70)
 
     try:
-        result = subprocess.run(cmd, check=True)
-        logger.info("\n" + "=" * 70)
-        logger.info("✓ Video download completed successfully")
-        logger.info("=" * 70)
-        return 0
-    except subprocess.CalledProcessError as e:
-        logger.error(f"\n✗ Video download failed with error code {e.returncode}")
+        result = download_videos(all_tweet_ids, limit=args.limit, force=args.force)
+    except Exception as e:
+        logger.error(f"\n✗ Video download failed: {e}")
+        return 1
+    if result is None:
+        logger.error("\n✗ Video download failed")
         return 1
-    finally:
-        # Clean up temp file
-        if temp_file.exists():
-            temp_file.unlink()
-            logger.info(f"Cleaned up temporary file: {temp_file}")
+
+    logger.info("\n" + "=" * 70)
+    logger.info("✓ Video download completed successfully")
+    logger.info("=" * 70)
+    return 0
 
 
 if __name__ == "__main__":
@@ -6,11 +6,19 @@ This script downloads X/Twitter Community Notes data and filters for video-relat
 import requests
 import pandas as pd
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
 import logging
+import tempfile
+import threading
 import zipfile
-from io import BytesIO
+
+# Use pyarrow for a compact Parquet copy of the filtered notes when available
+try:
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
 
 # Set up logging
 logging.basicConfig(
@@ -22,6 +30,48 @@ logger = logging.getLogger(__name__)
 BASE_URL = "https://ton.twimg.com/birdwatch-public-data"
 # Note: Files are distributed as .zip files, not direct .tsv files
 
+# Bytes per chunk when streaming a ZIP download to disk
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+# Worker threads for the HEAD probes of candidate release dates and, in
+# download_all_data, for the concurrent downloads (one bounded pool)
+PROBE_MAX_WORKERS = 8
+
+# Data files fetched by download_all_data, downloaded concurrently
+DATA_FILE_TYPES = ["notes", "ratings", "noteStatusHistory"]
+
+# Release dates probed for each file, newest first (data is updated periodically)
+RELEASE_DATES = [
+    "2025/11/26",
+    "2025/11/25",
+    "2025/11/24",
+    "2025/11/20",
+    "2025/11/01",
+    "2025/10/01",
+    "2024/12/01",
+]
+
+# Columns of notes-00000.tsv used by the media filter and its outputs; the
+# rest of the (wide) file is skipped while parsing
+NOTES_USECOLS = [
+    "noteId",
+    "tweetId",
+    "createdAtMillis",
+    "classification",
+    "summary",
+    "isMediaNote",
+]
+# Nullable Int64: a blank ID/timestamp cell becomes <NA> instead of making
+# read_csv fail for the whole file
+NOTES_DTYPES = {
+    "noteId": "Int64",
+    "tweetId": "Int64",
+    "createdAtMillis": "Int64",
+    "classification": "category",
+}
+# Columns kept in the filtered media notes output
+MEDIA_KEEP_COLS = ["noteId", "tweetId", "createdAtMillis", "classification", "summary"]
+
 
 class CommunityNotesDownloader:
     def __init__(self, data_dir="data"):
@@ -33,16 +83,49 @@ class CommunityNotesDownloader:
         self.filtered_dir = self.data_dir / "filtered"
         self.filtered_dir.mkdir(exist_ok=True)
 
+        # One keep-alive HTTP session per thread (requests.Session is not
+        # documented as thread-safe); see the http property
+        self._local = threading.local()
+        self._http_sessions = []
+        self._http_sessions_lock = threading.Lock()
+
+    @property
+    def http(self):
+        """requests.Session of the calling thread, created on first use."""
+        http = getattr(self._local, "http", None)
+        if http is None:
+            http = self._local.http = requests.Session()
+            with self._http_sessions_lock:
+                self._http_sessions.append(http)
+        return http
+
+    def close_http_sessions(self):
+        """Close every per-thread HTTP session opened so far."""
+        with self._http_sessions_lock:
+            sessions, self._http_sessions = self._http_sessions, []
+            self._local = threading.local()
+        for http in sessions:
+            http.close()
+
     def download_and_extract_zip(self, url, filename):
         """Download a ZIP file from the given URL and extract it."""
         logger.info(f"Downloading {filename}...")
+        tmp_path = None
         try:
-            response = requests.get(url, timeout=300)
-            response.raise_for_status()
+            # Stream the ZIP to a temporary file next to the extracted data
+            # instead of buffering the whole archive in memory
+            with self.http.get(url, stream=True, timeout=300) as response:
+                response.raise_for_status()
+                with tempfile.NamedTemporaryFile(
+                    dir=self.raw_dir, suffix=".zip", delete=False
+                ) as tmp:
+                    tmp_path = tmp.name
+                    for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                        tmp.write(chunk)
 
             # Extract the zip file
             logger.info(f"Extracting {filename}...")
-            with zipfile.ZipFile(BytesIO(response.content)) as zip_file:
+            with zipfile.ZipFile(tmp_path) as zip_file:
                 # Extract all files to raw directory
                 zip_file.extractall(self.raw_dir)
                 extracted_files = zip_file.namelist()
@@ -72,47 +155,95 @@ class CommunityNotesDownloader:
         except zipfile.BadZipFile as e:
             logger.error(f"Failed to extract {filename}: {e}")
             return None
+        finally:
+            if tmp_path is not None:
+                os.unlink(tmp_path)
 
-    def try_download_with_dates(self, file_type):
-        """Try to download files with different date patterns."""
-        # Try recent dates (data is updated periodically)
-        dates_to_try = [
-            "2025/11/26",
-            "2025/11/25",
-            "2025/11/24",
-            "2025/11/20",
-            "2025/11/01",
-            "2025/10/01",
-            "2024/12/01",
+    def url_exists(self, url):
+        """Return True if a HEAD request for url succeeds with status 200."""
+        try:
+            return self.http.head(url, timeout=30).status_code == 200
+        except requests.exceptions.RequestException:
+            return False
+
+    def dated_urls(self, file_type):
+        """Candidate ZIP URLs for file_type, one per release date, newest first."""
+        # Files are distributed as .zip files
+        return [
+            f"{BASE_URL}/{date}/{file_type}/{file_type}-00000.zip"
+            for date in RELEASE_DATES
         ]
 
-        for date in dates_to_try:
-            # Files are distributed as .zip files
-            url = f"{BASE_URL}/{date}/{file_type}/{file_type}-00000.zip"
-            logger.info(f"Trying URL: {url}")
+    def pick_download_url(self, file_type, urls, found):
+        """
+        Choose the URL to download for file_type.
+
+        Args:
+            file_type: Data file type (e.g. "notes")
+            urls: Candidate URLs from dated_urls, newest first
+            found: Probe results (True if the URL exists), aligned with urls
 
-            try:
-                response = requests.head(url, timeout=30)
-                if response.status_code == 200:
-                    logger.info(f"Found valid URL for {file_type}: {url}")
-                    return self.download_and_extract_zip(url, f"{file_type}-00000.zip")
-            except:
-                continue
+        Returns:
+            The newest existing dated URL, else the undated (older format) URL
+        """
+        for url, exists in zip(urls, found):
+            if exists:
+                logger.info(f"Found valid URL for {file_type}: {url}")
+                return url
 
         # Try without date (older format)
         url = f"{BASE_URL}/{file_type}-00000.zip"
         logger.info(f"Trying URL without date: {url}")
-        return self.download_and_extract_zip(url, f"{file_type}-00000.zip")
+        return url
+
+    def try_download_with_dates(self, file_type):
+        """Try to download files with different date patterns."""
+        urls = self.dated_urls(file_type)
+        logger.info(f"Probing {len(urls)} candidate URLs for {file_type}...")
+
+        # Probe all dates concurrently, then take the newest that exists
+        try:
+            with ThreadPoolExecutor(max_workers=PROBE_MAX_WORKERS) as executor:
+                found = list(executor.map(self.url_exists, urls))
+            url = self.pick_download_url(file_type, urls, found)
+            return self.download_and_extract_zip(url, f"{file_type}-00000.zip")
+        finally:
+            self.close_http_sessions()
 
     def download_all_data(self):
         """Download all Community Notes data files."""
         logger.info("Starting Community Notes data download...")
 
+        # One bounded pool for everything: first probe every candidate date
+        # of every file type, then download each file type's newest release
+        # (independent network-bound transfers) on the same workers
         downloaded_files = {}
-        for file_type in ["notes", "ratings", "noteStatusHistory"]:
-            filepath = self.try_download_with_dates(file_type)
-            if filepath and filepath.exists():
-                downloaded_files[file_type] = filepath
+        try:
+            with ThreadPoolExecutor(max_workers=PROBE_MAX_WORKERS) as executor:
+                probes = {}
+                for file_type in DATA_FILE_TYPES:
+                    urls = self.dated_urls(file_type)
+                    logger.info(f"Probing {len(urls)} candidate URLs for {file_type}...")
+                    probes[file_type] = (
+                        urls,
+                        [executor.submit(self.url_exists, url) for url in urls],
+                    )
+
+                futures = {}
+                for file_type, (urls, probe_futures) in probes.items():
+                    found = (probe.result() for probe in probe_futures)
+                    url = self.pick_download_url(file_type, urls, found)
+                    download = executor.submit(
+                        self.download_and_extract_zip, url, f"{file_type}-00000.zip"
+                    )
+                    futures[download] = file_type
+
+                for future in as_completed(futures):
+                    filepath = future.result()
+                    if filepath and filepath.exists():
+                        downloaded_files[futures[future]] = filepath
+        finally:
+            self.close_http_sessions()  # One per worker thread
 
         return downloaded_files
 
@@ -120,7 +251,13 @@ class CommunityNotesDownloader:
         """Load notes data from TSV file."""
         try:
             logger.info(f"Loading notes data from {filepath}...")
-            df = pd.read_csv(filepath, sep="\t", low_memory=False)
+            df = pd.read_csv(
+                filepath,
+                sep="\t",
+                usecols=lambda column: column in NOTES_USECOLS,
+                dtype=NOTES_DTYPES,
+                engine="c",
+            )
             logger.info(f"Loaded {len(df)} notes")
             logger.info(f"Columns: {df.columns.tolist()}")
             return df
@@ -145,7 +282,8 @@ class CommunityNotesDownloader:
 
         # Filter using isMediaNote column (1 = media note, 0 = not media)
         if "isMediaNote" in notes_df.columns:
-            media_notes = notes_df[notes_df["isMediaNote"] == 1].copy()
+            keep_cols = [col for col in MEDIA_KEEP_COLS if col in notes_df.columns]
+            media_notes = notes_df.loc[notes_df["isMediaNote"].eq(1), keep_cols].copy()
             logger.info(f"Found {len(media_notes)} media notes using isMediaNote column")
         else:
             logger.warning("isMediaNote column not found, cannot filter properly")
@@ -165,7 +303,7 @@ class CommunityNotesDownloader:
         return media_notes
 
     def save_filtered_data(self, df, filename="video_notes.csv"):
-        """Save filtered data to CSV."""
+        """Save filtered data to CSV, plus Parquet when pyarrow is installed."""
         if df is None or df.empty:
             logger.warning("No data to save")
             return None
@@ -174,10 +312,12 @@ class CommunityNotesDownloader:
         df.to_csv(filepath, index=False)
         logger.info(f"Saved {len(df)} filtered notes to {filepath}")
 
-        # Also save as TSV for consistency
-        tsv_filepath = self.filtered_dir / filename.replace(".csv", ".tsv")
-        df.to_csv(tsv_filepath, sep="\t", index=False)
-        logger.info(f"Also saved as TSV: {tsv_filepath}")
+        if pyarrow is not None:
+            parquet_filepath = filepath.with_suffix(".parquet")
+            df.to_parquet(
+                parquet_filepath, engine="pyarrow", compression="zstd", index=False
+            )
+            logger.info(f"Also saved as Parquet: {parquet_filepath}")
 
         return filepath
 
@@ -218,8 +358,32 @@ class CommunityNotesDownloader:
 
         logger.info(f"Summary report saved to {report_path}")
 
+    def count_media_notes(self, csv_path):
+        """
+        Count rows of a filtered notes file without parsing its contents.
+
+        Reads the row count from the Parquet footer when the Parquet copy is
+        at least as new as the CSV, otherwise counts CSV rows in chunks of
+        the first column only.
+        """
+        parquet_path = csv_path.with_suffix(".parquet")
+        if (
+            pyarrow is not None
+            and parquet_path.exists()
+            and parquet_path.stat().st_mtime >= csv_path.stat().st_mtime
+        ):
+            return pyarrow.parquet.ParquetFile(parquet_path).metadata.num_rows
+        return sum(
+            len(chunk) for chunk in pd.read_csv(csv_path, usecols=[0], chunksize=200_000)
+        )
+
     def run(self):
-        """Main execution method."""
+        """
+        Main execution method.
+
+        Returns:
+            Path to the filtered media notes CSV, or None on failure
+        """
         logger.info("=" * 50)
         logger.info("Community Notes Media Filter")
         logger.info("=" * 50)
@@ -246,6 +410,19 @@ class CommunityNotesDownloader:
                 )
                 return None
 
+        # Filtered data from a previous run: raw data is in place, so there
+        # is nothing to parse or filter
+        existing_media_notes = self.filtered_dir / "media_notes.csv"
+        if existing_media_notes.exists():
+            logger.info(f"\n✓ Found existing filtered data: {existing_media_notes}")
+            logger.info("Skipping filtering step...")
+            logger.info(f"Media notes file: {existing_media_notes}")
+            logger.info(
+                f"Total media notes: {self.count_media_notes(existing_media_notes)}"
+            )
+            logger.info("\nNext step: Run 'python main.py filter' to identify videos")
+            return existing_media_notes
+
         # Step 2: Load notes data
         notes_df = self.load_notes_data(downloaded_files["notes"])
 
@@ -253,25 +430,14 @@ class CommunityNotesDownloader:
             logger.error("Failed to load notes data")
             return None
 
-        # Check if filtered data already exists
-        existing_media_notes = self.filtered_dir / "media_notes.csv"
-        if existing_media_notes.exists():
-            logger.info(f"\n✓ Found existing filtered data: {existing_media_notes}")
-            logger.info("Skipping filtering step...")
-            media_notes_df = pd.read_csv(existing_media_notes)
-            logger.info(f"Loaded {len(media_notes_df)} media notes from existing file")
-        else:
-            # Step 3: Filter for media content
-            media_notes_df = self.filter_media_notes(notes_df)
+        # Step 3: Filter for media content
+        media_notes_df = self.filter_media_notes(notes_df)
 
         # Step 4: Save filtered data
-        if media_notes_df is not None and not media_notes_df.empty and not existing_media_notes.exists():
-            if not existing_media_notes.exists():
-                output_file = self.save_filtered_data(media_notes_df, filename="media_notes.csv")
-                # Step 5: Generate report
-                self.generate_summary_report(notes_df, media_notes_df)
-            else:
-                output_file = existing_media_notes
+        if media_notes_df is not None and not media_notes_df.empty:
+            output_file = self.save_filtered_data(media_notes_df, filename="media_notes.csv")
+            # Step 5: Generate report
+            self.generate_summary_report(notes_df, media_notes_df)
 
             logger.info("\n" + "=" * 50)
             logger.info("SUCCESS: Media notes ready!")
@@ -281,7 +447,7 @@ class CommunityNotesDownloader:
             logger.info(f"Unique tweets: {media_notes_df['tweetId'].nunique()}")
             logger.info("\nNext step: Run 'python main.py filter' to identify videos")
 
-            return media_notes_df
+            return output_file
         else:
             logger.warning("No media notes found in the dataset")
             return None
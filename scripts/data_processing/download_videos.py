@@ -20,6 +20,12 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from database import get_session, MediaMetadata, Tweet
 
+# Use orjson for info.json / metadata files when available (faster than json)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 load_dotenv()
 
 logging.basicConfig(
@@ -207,11 +213,14 @@ class VideoDownloader:
 
                     if info_file.exists():
                         try:
-                            with open(info_file, "r") as f:
-                                info = json.load(f)
-                                metadata["duration"] = info.get("duration", 0)
-                                metadata["title"] = info.get("title", "")
-                                metadata["uploader"] = info.get("uploader", "")
+                            if orjson is not None:
+                                info = orjson.loads(info_file.read_bytes())
+                            else:
+                                with open(info_file, "r") as f:
+                                    info = json.load(f)
+                            metadata["duration"] = info.get("duration", 0)
+                            metadata["title"] = info.get("title", "")
+                            metadata["uploader"] = info.get("uploader", "")
                         except:
                             pass
 
@@ -271,8 +280,13 @@ class VideoDownloader:
 
     def save_metadata(self):
         """Save download metadata."""
-        with open(self.metadata_file, "w") as f:
-            json.dump(self.metadata, f, indent=2)
+        if orjson is not None:
+            self.metadata_file.write_bytes(
+                orjson.dumps(self.metadata, option=orjson.OPT_INDENT_2)
+            )
+        else:
+            with open(self.metadata_file, "w") as f:
+                json.dump(self.metadata, f, indent=2)
         logger.info(f"\nMetadata saved to: {self.metadata_file}")
 
     def run(self, limit=30):
@@ -344,6 +358,27 @@ class VideoDownloader:
         return self.metadata
 
 
+def download_videos(tweet_ids=None, limit=30, force=False, data_dir="data"):
+    """
+    Download videos in-process, optionally restricted to a set of tweets.
+
+    Args:
+        tweet_ids: Tweet IDs to filter by (None for all pending videos)
+        limit: Maximum number of videos to download (None for no limit)
+        force: Re-download videos even if already downloaded
+        data_dir: Base data directory
+
+    Returns:
+        List of downloaded video metadata, or None if the download failed
+    """
+    downloader = VideoDownloader(
+        data_dir=data_dir,
+        force=force,
+        tweet_ids=[str(tweet_id) for tweet_id in tweet_ids] if tweet_ids else None,
+    )
+    return downloader.run(limit=limit)
+
+
 def main():
     """Main entry point."""
     import argparse
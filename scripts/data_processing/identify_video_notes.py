@@ -194,6 +194,7 @@ class VideoNoteIdentifier:
             Each worker thread creates its own database session for thread-safety.
         """
         results = []
+        videos_found = 0  # Running count, updated per batch
         total = len(df)
         
         logger.info(f"\nChecking {total} media notes...")
@@ -213,36 +214,40 @@ class VideoNoteIdentifier:
             with ThreadPoolExecutor(max_workers=max_workers) as executor:
                 # Submit all tasks
                 # Each worker will create its own thread-safe database session
+                # Only the index and tweetId are needed: zip the columns
+                # instead of building a Series per row with iterrows()
                 future_to_row = {}
-                for idx, row in batch_df.iterrows():
+                for idx, tweet_id in zip(
+                    batch_df.index, batch_df["tweetId"].tolist()
+                ):
                     future = executor.submit(
                         self.download_metadata_only,
-                        row["tweetId"],
+                        tweet_id,
                         idx,
                         save_to_db=True,  # Save to database (thread-safe)
                     )
-                    future_to_row[future] = (idx, row)
+                    future_to_row[future] = (idx, tweet_id)
                 
                 # Collect results as they complete
                 for future in as_completed(future_to_row):
-                    idx, row = future_to_row[future]
+                    idx, tweet_id = future_to_row[future]
                     try:
                         result = future.result()
                         media_type = result["media_type"] if result else None
                         batch_results.append(
                             {
                                 "index": idx,
-                                "tweetId": row["tweetId"],
+                                "tweetId": tweet_id,
                                 "media_type": media_type,
                                 "is_video": media_type == "video",
                             }
                         )
                     except Exception as e:
-                        logger.debug(f"Error processing {row['tweetId']}: {e}")
+                        logger.debug(f"Error processing {tweet_id}: {e}")
                         batch_results.append(
                             {
                                 "index": idx,
-                                "tweetId": row["tweetId"],
+                                "tweetId": tweet_id,
                                 "media_type": None,
                                 "is_video": False,
                             }
@@ -251,7 +256,7 @@ class VideoNoteIdentifier:
             results.extend(batch_results)
             
             # Show progress
-            videos_found = sum(1 for r in results if r["is_video"])
+            videos_found += sum(1 for r in batch_results if r["is_video"])
             logger.info(
                 f"  Progress: {len(results)}/{total} checked, {videos_found} videos found so far"
             )
@@ -262,8 +267,14 @@ class VideoNoteIdentifier:
         
         return results
     
-    def run(self, sample_size=None):
-        """Main execution."""
+    def run(self, sample_size=None, max_workers=20):
+        """
+        Main execution.
+
+        Args:
+            sample_size: Process only the first N notes (default: all)
+            max_workers: Number of parallel metadata downloads (default: 20)
+        """
         logger.info("=" * 70)
         logger.info("VIDEO NOTE IDENTIFIER - Accurate Media Type Detection")
         logger.info("=" * 70)
@@ -278,35 +289,34 @@ class VideoNoteIdentifier:
             logger.info("\nQuerying media notes from database...")
             
             # Base query for media notes
-            query = session.query(Note).filter(Note.is_media_note == True)
+            # Only the columns copied into the DataFrame below are loaded
+            query = session.query(
+                Note.tweet_id, Note.note_id, Note.summary, Note.classification
+            ).filter(Note.is_media_note == True)
             
             # Filter by specific tweet IDs if provided
             if self.tweet_ids:
                 query = query.filter(Note.tweet_id.in_(self.tweet_ids))
                 logger.info(f"Filtering for {len(self.tweet_ids)} specific tweet IDs")
             
-            media_notes_query = query.all()
-            logger.info(f"Found {len(media_notes_query)} media notes in database")
-
-            # Get tweet IDs that already have media_metadata (unless force mode)
+            # Skip tweets that already have media_metadata (unless force mode),
+            # as an anti-join in SQL instead of loading every processed tweet ID
             if not self.force:
-                existing_media = session.query(MediaMetadata.tweet_id).all()
-                existing_tweet_ids = {m[0] for m in existing_media}
-                logger.info(
-                    f"Found {len(existing_tweet_ids)} tweets with existing media metadata"
+                already_processed = (
+                    session.query(MediaMetadata.tweet_id)
+                    .filter(MediaMetadata.tweet_id == Note.tweet_id)
+                    .exists()
                 )
+                query = query.filter(~already_processed)
                 logger.info(
                     "Skipping already-processed tweets (use --force to re-process)"
                 )
-
-                # Filter out already-processed tweets
-                media_notes_query = [
-                    n for n in media_notes_query if n.tweet_id not in existing_tweet_ids
-                ]
-                logger.info(f"Remaining tweets to process: {len(media_notes_query)}")
             else:
                 logger.info("Force mode: Re-processing all media notes")
 
+            media_notes_query = query.all()
+            logger.info(f"Media notes to process: {len(media_notes_query)}")
+
             # IMPORTANT: Extract data WHILE session is still active
             # This prevents DetachedInstanceError when accessing attributes later
             media_notes_data = [
@@ -333,7 +343,7 @@ class VideoNoteIdentifier:
                 
         # Identify videos and save to database
         # Note: Session is NOT passed - each worker creates its own thread-safe session
-        results = self.identify_videos_batch(df)
+        results = self.identify_videos_batch(df, max_workers=max_workers)
         
         # Create results DataFrame
         results_df = pd.DataFrame(results)
@@ -420,6 +430,12 @@ def main():
         default=None,
         help="Path to file with tweet IDs to process (one per line)",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=20,
+        help="Number of parallel metadata downloads (default: 20)",
+    )
     args = parser.parse_args()
     
     # Load tweet IDs from file if provided
@@ -435,7 +451,7 @@ def main():
             sys.exit(1)
     
     identifier = VideoNoteIdentifier(data_dir="data", force=args.force, tweet_ids=tweet_ids)
-    result = identifier.run(sample_size=args.sample)
+    result = identifier.run(sample_size=args.sample, max_workers=args.jobs)
     
     if result is not None and len(result) > 0:
         print(f"\n✓ Successfully identified {len(result)} video notes!")
@@ -9,6 +9,8 @@ Updated to use database and skip tweets with existing raw_api_data.
 import os
 import logging
 import sys
+import threading
+import time
 from pathlib import Path
 from typing import Dict, List, Optional
 from dotenv import load_dotenv
@@ -17,11 +19,67 @@ from dotenv import load_dotenv
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from database import get_session, Tweet
+from database.queries import id_in
 from database.import_data import import_tweets_from_api_data
 
+# Parse API responses with orjson when available (faster than stdlib json)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# Minimum gap between API requests, across all worker threads (seconds)
+API_REQUEST_INTERVAL = 1.0
+# Wait after a 429 response before any worker retries (seconds)
+RATE_LIMIT_WAIT = 900
+
+
+class _RequestThrottle:
+    """
+    Rate limiter shared by the worker threads of one fetch_tweets call.
+
+    Spaces request starts at least API_REQUEST_INTERVAL apart, so the
+    request rate matches a single worker no matter how many threads run,
+    and keeps one "rate limited until" deadline that every worker honours
+    after a 429 (instead of each worker backing off on its own).
+    """
+
+    def __init__(self, interval: float = API_REQUEST_INTERVAL):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_request_at = 0.0
+        self._limited_until = 0.0
+        self._cancelled = threading.Event()
+
+    def wait(self):
+        """
+        Block until this thread may send its next request.
+
+        Raises:
+            RuntimeError: If the throttle was cancelled while waiting
+        """
+        with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_request_at, self._limited_until)
+            self._next_request_at = start_at + self.interval
+        if self._cancelled.wait(max(start_at - now, 0)):
+            raise RuntimeError("Request cancelled after an earlier batch failed")
+
+    def cancel(self):
+        """Wake all waiting workers and stop further requests."""
+        self._cancelled.set()
+
+    def rate_limited(self, wait: float = RATE_LIMIT_WAIT):
+        """Record a 429: no worker sends again until the window has passed."""
+        with self._lock:
+            limited_until = time.monotonic() + wait
+            if limited_until - self._limited_until > self.interval:
+                logger.warning(f"Rate limit reached. Waiting {wait / 60:.0f} minutes...")
+            self._limited_until = max(self._limited_until, limited_until)
+
 
 class TwitterService:
     """Handles all Twitter API interactions."""
@@ -46,15 +104,19 @@ class TwitterService:
         Returns:
             List of tweet IDs that need to be fetched
         """
+        # Deduplicate input tweet IDs (order-preserving) so no API quota is
+        # spent on repeats, in force mode too
+        unique_tweet_ids = list(dict.fromkeys(str(tid) for tid in tweet_ids if tid))
+
         if self.force:
-            logger.info(f"Force mode: Re-fetching all {len(tweet_ids)} tweets")
-            return tweet_ids
+            logger.info(f"Force mode: Re-fetching all {len(unique_tweet_ids)} tweets")
+            return unique_tweet_ids
 
         # Query tweets that have raw_api_data
         existing_tweets = (
             session.query(Tweet.tweet_id)
             .filter(
-                Tweet.tweet_id.in_([int(tid) for tid in tweet_ids]),
+                id_in(Tweet.tweet_id, unique_tweet_ids),
                 Tweet.raw_api_data.isnot(None),
             )
             .all()
@@ -62,8 +124,7 @@ class TwitterService:
 
         existing_ids = {str(t[0]) for t in existing_tweets}
 
-        # Deduplicate input tweet IDs and filter out existing
-        unique_tweet_ids = list(set(tweet_ids))
+        # Filter out existing
         tweets_to_fetch = [tid for tid in unique_tweet_ids if tid not in existing_ids]
 
         logger.info(f"Unique tweet IDs to check: {len(unique_tweet_ids)}")
@@ -72,16 +133,75 @@ class TwitterService:
 
         return tweets_to_fetch
 
+    def _new_http_session(self):
+        """Create a keep-alive requests.Session carrying the bearer token."""
+        import requests
+
+        http = requests.Session()
+        http.headers["Authorization"] = f"Bearer {self.bearer_token}"
+        return http
+
+    def _request_batch(self, http, throttle, batch: List[str]) -> Optional[Dict]:
+        """
+        Request one batch of tweets (max 100 IDs) from the API.
+
+        Waits and retries when the rate limit is hit. Safe to call from
+        worker threads: it only does HTTP, no database access.
+
+        Args:
+            http: requests.Session owned by the calling worker thread
+            throttle: _RequestThrottle shared by all workers of this fetch
+            batch: Tweet IDs in this batch
+
+        Returns:
+            Parsed JSON response, or None on API error
+        """
+        params = {
+            "ids": ",".join(str(tid) for tid in batch),
+            "tweet.fields": "created_at,author_id,public_metrics,text,entities,attachments,lang,referenced_tweets",
+            "user.fields": "name,username,verified",
+            "expansions": "author_id,attachments.media_keys",
+            "media.fields": "type,url,duration_ms,preview_image_url",
+        }
+
+        while True:
+            throttle.wait()
+            response = http.get(f"{self.base_url}/tweets", params=params)
+
+            if response.status_code == 429:
+                throttle.rate_limited()
+                continue
+
+            if response.status_code == 200:
+                if orjson is not None:
+                    return orjson.loads(response.content)
+                return response.json()
+
+            logger.error(f"API error: {response.status_code}")
+            return None
+
     def fetch_tweets(
-        self, tweet_ids: List[str], batch_size: int = 100, save_to_db: bool = True
+        self,
+        tweet_ids: List[str],
+        batch_size: int = 100,
+        save_to_db: bool = True,
+        max_workers: int = 1,
     ) -> Dict[str, Dict]:
         """
         Fetch tweet data from Twitter API and optionally save to database.
 
+        Batches are requested concurrently by up to max_workers threads, each
+        with its own keep-alive requests.Session (Session objects are not
+        documented as thread-safe). All workers share one throttle, so the
+        request rate and 429 back-off are the same as with a single worker;
+        extra workers only overlap request latency. Responses are parsed and
+        saved on the calling thread, so the database session is never shared.
+
         Args:
             tweet_ids: List of tweet IDs to fetch
             batch_size: Number of tweets per request (max 100)
             save_to_db: If True, save to database immediately
+            max_workers: Number of batches requested in parallel (default: 1)
 
         Returns:
             Dictionary mapping tweet_id to tweet data
@@ -91,8 +211,8 @@ class TwitterService:
             return {}
 
         try:
-            import requests
-            import time
+            from concurrent.futures import ThreadPoolExecutor, as_completed
+            from contextlib import ExitStack
 
             with get_session() as session:
                 # Filter out tweets that already have API data (unless force mode)
@@ -103,83 +223,97 @@ class TwitterService:
                     return {}
 
                 tweets_data = {}
-                total_batches = (len(tweet_ids) + batch_size - 1) // batch_size
-
-                for i in range(0, len(tweet_ids), batch_size):
-                    batch = tweet_ids[i : i + batch_size]
-                    batch_num = i // batch_size + 1
-
-                    logger.info(
-                        f"Fetching batch {batch_num}/{total_batches} ({len(batch)} tweets)..."
-                    )
-
-                    params = {
-                        "ids": ",".join(str(tid) for tid in batch),
-                        "tweet.fields": "created_at,author_id,public_metrics,text,entities,attachments,lang,referenced_tweets",
-                        "user.fields": "name,username,verified",
-                        "expansions": "author_id,attachments.media_keys",
-                        "media.fields": "type,url,duration_ms,preview_image_url",
+                batches = [
+                    tweet_ids[i : i + batch_size]
+                    for i in range(0, len(tweet_ids), batch_size)
+                ]
+                total_batches = len(batches)
+
+                # One HTTP session per worker thread (reused across that
+                # worker's batches, closed by the ExitStack once the pool has
+                # shut down); one throttle shared by all of them
+                throttle = _RequestThrottle()
+                local = threading.local()
+
+                def request_batch(batch):
+                    http = getattr(local, "http", None)
+                    if http is None:
+                        http = local.http = http_sessions.enter_context(
+                            self._new_http_session()
+                        )
+                    return self._request_batch(http, throttle, batch)
+
+                logger.info(
+                    f"Fetching {total_batches} batches with {max_workers} worker(s)..."
+                )
+
+                with ExitStack() as http_sessions, ThreadPoolExecutor(
+                    max_workers=max_workers
+                ) as executor:
+                    future_to_batch = {
+                        executor.submit(request_batch, batch): batch_num
+                        for batch_num, batch in enumerate(batches, 1)
                     }
 
-                    headers = {"Authorization": f"Bearer {self.bearer_token}"}
-                    response = requests.get(
-                        f"{self.base_url}/tweets", params=params, headers=headers
-                    )
-
-                    if response.status_code == 200:
-                        data = response.json()
-                        tweets = data.get("data", [])
-                        users = {
-                            u["id"]: u
-                            for u in data.get("includes", {}).get("users", [])
-                        }
-
-                        # Build tweet data for CURRENT batch only
-                        batch_tweets_data = {}
-                        for tweet in tweets:
-                            author = users.get(tweet.get("author_id"), {})
-                            metrics = tweet.get("public_metrics", {})
-
-                            tweet_data = {
-                                "tweet_id": tweet["id"],
-                                "text": tweet.get("text", ""),
-                                "created_at": tweet.get("created_at", ""),
-                                "author_id": tweet.get("author_id", ""),
-                                "author_name": author.get("name", ""),
-                                "author_username": author.get("username", ""),
-                                "author_verified": author.get("verified", False),
-                                "likes": metrics.get("like_count", 0),
-                                "retweets": metrics.get("retweet_count", 0),
-                                "replies": metrics.get("reply_count", 0),
-                                "quotes": metrics.get("quote_count", 0),
-                                "lang": tweet.get("lang"),  # Language code
-                                "referenced_tweets": tweet.get(
-                                    "referenced_tweets"
-                                ),  # For identifying retweets/replies
-                                "raw_response": data,  # Store full API response
+                    # Stop at the first failure like the old sequential loop:
+                    # cancel queued batches and throttle waits instead of
+                    # letting the pool shutdown run them to completion
+                    try:
+                        for future in as_completed(future_to_batch):
+                            batch_num = future_to_batch[future]
+                            data = future.result()
+                            if data is None:
+                                continue
+
+                            tweets = data.get("data", [])
+                            users = {
+                                u["id"]: u
+                                for u in data.get("includes", {}).get("users", [])
                             }
 
-                            # Add to both global accumulator and current batch
-                            tweets_data[tweet["id"]] = tweet_data
-                            batch_tweets_data[tweet["id"]] = tweet_data
-
-                        logger.info(f"  ✓ Fetched {len(tweets)} tweets")
+                            # Build tweet data for CURRENT batch only
+                            batch_tweets_data = {}
+                            for tweet in tweets:
+                                author = users.get(tweet.get("author_id"), {})
+                                metrics = tweet.get("public_metrics", {})
+
+                                tweet_data = {
+                                    "tweet_id": tweet["id"],
+                                    "text": tweet.get("text", ""),
+                                    "created_at": tweet.get("created_at", ""),
+                                    "author_id": tweet.get("author_id", ""),
+                                    "author_name": author.get("name", ""),
+                                    "author_username": author.get("username", ""),
+                                    "author_verified": author.get("verified", False),
+                                    "likes": metrics.get("like_count", 0),
+                                    "retweets": metrics.get("retweet_count", 0),
+                                    "replies": metrics.get("reply_count", 0),
+                                    "quotes": metrics.get("quote_count", 0),
+                                    "lang": tweet.get("lang"),  # Language code
+                                    "referenced_tweets": tweet.get(
+                                        "referenced_tweets"
+                                    ),  # For identifying retweets/replies
+                                    "raw_response": data,  # Store full API response
+                                }
+
+                                # Add to both global accumulator and current batch
+                                tweets_data[tweet["id"]] = tweet_data
+                                batch_tweets_data[tweet["id"]] = tweet_data
 
-                        # Save ONLY current batch to database
-                        if save_to_db and batch_tweets_data:
-                            import_tweets_from_api_data(session, batch_tweets_data)
                             logger.info(
-                                f"  ✓ Saved {len(batch_tweets_data)} tweets to database"
+                                f"  ✓ Batch {batch_num}/{total_batches}: fetched {len(tweets)} tweets"
                             )
 
-                    elif response.status_code == 429:
-                        logger.warning("Rate limit reached. Waiting 15 minutes...")
-                        time.sleep(900)
-                        continue
-                    else:
-                        logger.error(f"API error: {response.status_code}")
-
-                    time.sleep(1)  # Rate limiting
+                            # Save ONLY current batch to database
+                            if save_to_db and batch_tweets_data:
+                                import_tweets_from_api_data(session, batch_tweets_data)
+                                logger.info(
+                                    f"  ✓ Saved {len(batch_tweets_data)} tweets to database"
+                                )
+                    except BaseException:
+                        throttle.cancel()  # Also wakes workers in a 429 wait
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        raise
 
                 logger.info(f"Total tweets fetched: {len(tweets_data)}")
                 if save_to_db:
@@ -11,6 +11,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from database import get_session, Note, Tweet, MediaMetadata
+from sqlalchemy.orm import undefer
 import logging
 
 logging.basicConfig(
@@ -89,8 +90,10 @@ def test_skip_logic():
             logger.info(f"  - Download: {need_download} new videos")
             
             # Test tweet API skip logic
-            all_tweets = session.query(Tweet).all()
-            have_api_data = sum(1 for t in all_tweets if t.raw_api_data is not None)
+            all_tweets = (
+                session.query(Tweet).options(undefer(Tweet.has_api_data)).all()
+            )
+            have_api_data = sum(1 for t in all_tweets if t.has_api_data)
             need_api_data = len(all_tweets) - have_api_data
             
             logger.info(f"✓ TwitterService would:")